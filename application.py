@@ -1,23 +1,31 @@
-import asyncio
+import hmac
 import logging
 import os
 import uuid
-from collections import defaultdict
-from datetime import datetime
 from pathlib import Path
+from typing import Literal, Optional
 
 import uvicorn
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Header, HTTPException, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
-from backend.graph import Graph
-from backend.services.mongodb import MongoDBService
+from backend.graph import Graph, get_compiled_graph, get_nodes
+from backend.services.clients import clients
+from backend.services.concurrency import limiters
+from backend.services.content_store import get_content_store
+from backend.services.domain_breaker import get_domain_breaker
+from backend.services.event_bus import create_event_bus
+from backend.services.job_scheduler import JobScheduler, QueueFullError
+from backend.services.job_store import create_job_store
+from backend.services.metrics import current_job, metrics
+from backend.services.mongodb import AsyncMongoDBService, InMemoryMongoDBService, MongoDBService
 from backend.services.pdf_service import PDFService
-from backend.services.websocket_manager import WebSocketManager
+from backend.services.search_cache import get_search_cache
+from backend.services.websocket_manager import WebSocketManager, status_update
 
 # Load environment variables from .env file at startup
 env_path = Path(__file__).parent / '.env'
@@ -51,32 +59,57 @@ if static_dir.exists():
     # Mount any other static files in the dist directory
     app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
-manager = WebSocketManager()
+event_bus = create_event_bus()
+manager = WebSocketManager(event_bus)
 pdf_service = PDFService({"pdf_output_dir": "pdfs"})
 
-job_status = defaultdict(lambda: {
-    "status": "pending",
-    "result": None,
-    "error": None,
-    "debug_info": [],
-    "company": None,
-    "report": None,
-    "last_update": datetime.now().isoformat()
-})
+job_status = create_job_store()
 
 mongodb = None
 if mongo_uri := os.getenv("MONGODB_URI"):
     try:
-        mongodb = MongoDBService(mongo_uri)
+        backend = InMemoryMongoDBService() if mongo_uri == "memory://" else MongoDBService(mongo_uri)
+        mongodb = AsyncMongoDBService(backend, max_workers=int(os.getenv("MONGODB_MAX_WORKERS", "4")))
         logger.info("MongoDB integration enabled")
     except Exception as e:
         logger.warning(f"Failed to initialize MongoDB: {e}. Continuing without persistence.")
 
+@app.on_event("startup")
+async def warm_up_graph():
+    """Build the shared nodes and compiled workflow before the first job arrives."""
+    try:
+        get_compiled_graph()
+    except Exception as e:
+        logger.warning(f"Failed to pre-compile research graph: {e}. Will retry on first job.")
+
+@app.on_event("startup")
+async def start_event_bus():
+    await event_bus.start()
+
+@app.on_event("startup")
+async def ensure_mongodb_indexes():
+    if mongodb:
+        try:
+            await mongodb.ensure_indexes()
+        except Exception as e:
+            logger.warning(f"Failed to create MongoDB indexes: {e}")
+
+@app.on_event("shutdown")
+async def close_upstream_clients():
+    await scheduler.stop()
+    await event_bus.stop()
+    await clients.aclose()
+    if mongodb:
+        await mongodb.close()
+
 class ResearchRequest(BaseModel):
     company: str
     company_url: str | None = None
     industry: str | None = None
     hq_location: str | None = None
+    priority: int = 0
+    # "llm", "fast" (template queries, no LLM) or "auto" (fast under load)
+    planning_mode: Literal["llm", "fast", "auto"] | None = None
 
 class PDFGenerationRequest(BaseModel):
     report_content: str
@@ -91,15 +124,36 @@ async def preflight():
     return response
 
 @app.post("/research")
-async def research(data: ResearchRequest):
+async def research(data: ResearchRequest, priority_token: Optional[str] = Header(None, alias="X-Priority-Token")):
     try:
         logger.info(f"Received research request for {data.company}")
         job_id = str(uuid.uuid4())
-        asyncio.create_task(process_research(job_id, data))
+        # Recorded before submit: a worker may start the job while submit is still announcing queue positions
+        job_status.update(job_id, status="pending", company=data.company)
+        try:
+            position = await scheduler.submit(job_id, data, priority=job_priority(data.priority, priority_token))
+        except QueueFullError as e:
+            logger.warning(f"Rejecting research request for {data.company}: {e}")
+            job_status.delete(job_id)
+            response = JSONResponse(
+                status_code=429,
+                content={
+                    "status": "rejected",
+                    "message": "Too many research jobs in progress. Please retry later.",
+                    "retry_after": e.retry_after
+                }
+            )
+            response.headers["Retry-After"] = str(e.retry_after)
+            response.headers["Access-Control-Allow-Origin"] = "*"
+            return response
+
+        if position and (job_status.get(job_id) or {}).get("status") == "pending":
+            job_status.update(job_id, status="queued")
 
         response = JSONResponse(content={
-            "status": "accepted",
+            "status": "queued" if position else "accepted",
             "job_id": job_id,
+            "queue_position": position,
             "message": "Research started. Connect to WebSocket for updates.",
             "websocket_url": f"/research/ws/{job_id}"
         })
@@ -113,39 +167,55 @@ async def research(data: ResearchRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 async def process_research(job_id: str, data: ResearchRequest):
+    # Upstream calls made on this job's behalf are attributed to it
+    current_job.set(job_id)
+    metrics.start_job(job_id)
     try:
         if mongodb:
-            mongodb.create_job(job_id, data.dict())
-        await asyncio.sleep(1)  # Allow WebSocket connection
+            await mongodb.create_job(job_id, data.dict())
 
+        job_status.update(job_id, status="processing")
         await manager.send_status_update(job_id, status="processing", message="Starting research")
 
+        # With jobs still waiting behind this one, skip the LLM round trip for query planning,
+        # unless the request or QUERY_PLANNING_MODE asks for a specific mode
+        planning_mode = data.planning_mode or get_nodes()["query_planner"].default_mode
+        if planning_mode == "auto" and scheduler.stats()["queued"] >= FAST_PLANNING_QUEUE_DEPTH:
+            planning_mode = "fast"
+
         graph = Graph(
             company=data.company,
             url=data.company_url,
             industry=data.industry,
             hq_location=data.hq_location,
             websocket_manager=manager,
-            job_id=job_id
+            job_id=job_id,
+            planning_mode=planning_mode
         )
 
         state = {}
         async for s in graph.run(thread={}):
             state.update(s)
+            if mongodb:
+                mongodb.queue_progress(job_id, status="processing", current_node=next(iter(s), None))
         
         # Look for the compiled report in either location.
         report_content = state.get('report') or (state.get('editor') or {}).get('report')
         if report_content:
             logger.info(f"Found report in final state (length: {len(report_content)})")
-            job_status[job_id].update({
-                "status": "completed",
-                "report": report_content,
-                "company": data.company,
-                "last_update": datetime.now().isoformat()
-            })
+            search_cache = get_search_cache()
+            job_metrics = metrics.finish_job(job_id, "completed")
+            job_status.update(
+                job_id,
+                status="completed",
+                report=report_content,
+                company=data.company,
+                search_cache=search_cache.pop_job_stats(job_id) if search_cache else None,
+                metrics=job_metrics
+            )
             if mongodb:
-                mongodb.update_job(job_id=job_id, status="completed")
-                mongodb.store_report(job_id=job_id, report_data={"report": report_content})
+                await mongodb.update_job(job_id=job_id, status="completed", result={"metrics": job_metrics})
+                await mongodb.store_report(job_id=job_id, report_data={"report": report_content})
             await manager.send_status_update(
                 job_id=job_id,
                 status="completed",
@@ -163,6 +233,8 @@ async def process_research(job_id: str, data: ResearchRequest):
             error_message = "No report found"
             if error := state.get('error'):
                 error_message = f"Error: {error}"
+            job_status.update(job_id, status="failed", error=error_message,
+                              metrics=metrics.finish_job(job_id, "failed"))
             
             await manager.send_status_update(
                 job_id=job_id,
@@ -173,6 +245,8 @@ async def process_research(job_id: str, data: ResearchRequest):
 
     except Exception as e:
         logger.error(f"Research failed: {str(e)}")
+        job_metrics = metrics.finish_job(job_id, "failed")
+        job_status.update(job_id, status="failed", error=str(e), metrics=job_metrics)
         await manager.send_status_update(
             job_id=job_id,
             status="failed",
@@ -180,10 +254,80 @@ async def process_research(job_id: str, data: ResearchRequest):
             error=str(e)
         )
         if mongodb:
-            mongodb.update_job(job_id=job_id, status="failed", error=str(e))
+            await mongodb.update_job(job_id=job_id, status="failed", error=str(e), result={"metrics": job_metrics})
+
+# Queued jobs at which "auto" planning switches to template queries
+FAST_PLANNING_QUEUE_DEPTH = int(os.getenv("FAST_PLANNING_QUEUE_DEPTH", "5"))
+
+# Jobs may always lower their priority; raising it above 0 needs the X-Priority-Token header
+# to match JOB_PRIORITY_TOKEN, and is capped at MAX_JOB_PRIORITY
+JOB_PRIORITY_TOKEN = os.getenv("JOB_PRIORITY_TOKEN")
+MAX_JOB_PRIORITY = int(os.getenv("MAX_JOB_PRIORITY", "10"))
+
+def job_priority(requested: int, token: Optional[str]) -> int:
+    trusted = bool(JOB_PRIORITY_TOKEN and token and hmac.compare_digest(token, JOB_PRIORITY_TOKEN))
+    return max(-MAX_JOB_PRIORITY, min(requested, MAX_JOB_PRIORITY if trusted else 0))
+
+scheduler = JobScheduler(
+    process_research,
+    max_concurrent_jobs=int(os.getenv("MAX_CONCURRENT_JOBS", "4")),
+    max_queue_size=int(os.getenv("MAX_QUEUED_JOBS", "20")),
+    websocket_manager=manager
+)
 
 # Remove the old ping endpoint - replaced with frontend serving
 
+@app.get("/metrics")
+async def get_metrics():
+    """Node, upstream call and WebSocket send timings in the Prometheus text format."""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/admin/pools")
+async def get_pool_stats():
+    """Connection pool utilisation for the shared upstream clients."""
+    return clients.stats()
+
+@app.get("/admin/limits")
+async def get_limiter_stats():
+    """Adaptive concurrency limits and queue depth for each upstream API."""
+    return limiters.stats()
+
+@app.get("/admin/websockets")
+async def get_websocket_stats():
+    """WebSocket connections and event coalescing counters for this worker."""
+    return manager.stats()
+
+@app.get("/admin/scheduler")
+async def get_scheduler_stats():
+    """Running and queued research jobs."""
+    return scheduler.stats()
+
+@app.get("/admin/jobs")
+async def get_job_store_stats():
+    """Size and eviction counters for the job status store."""
+    return job_status.stats()
+
+@app.get("/admin/search-cache")
+async def get_search_cache_stats():
+    """Hit/miss and size counters for the Tavily search cache."""
+    if not (search_cache := get_search_cache()):
+        raise HTTPException(status_code=404, detail="Search cache disabled")
+    return search_cache.stats()
+
+@app.get("/admin/content-store")
+async def get_content_store_stats():
+    """Size and hit/miss counters for the extracted content store."""
+    if not (content_store := get_content_store()):
+        raise HTTPException(status_code=404, detail="Content store disabled")
+    return content_store.stats()
+
+@app.get("/admin/domains")
+async def get_domain_breaker_stats():
+    """Domains whose content extraction circuit is tripped."""
+    if not (domain_breaker := get_domain_breaker()):
+        raise HTTPException(status_code=404, detail="Domain circuit breaker disabled")
+    return domain_breaker.stats()
+
 @app.get("/research/pdf/{filename}")
 async def get_pdf(filename: str):
     pdf_path = os.path.join("pdfs", filename)
@@ -191,21 +335,30 @@ async def get_pdf(filename: str):
         raise HTTPException(status_code=404, detail="PDF not found")
     return FileResponse(pdf_path, media_type='application/pdf', filename=filename)
 
+def connection_snapshot(job_id: str) -> Optional[dict]:
+    """The job's current state, for a new client with no events to replay."""
+    if position := scheduler.position(job_id):
+        return status_update(
+            "queued",
+            message=f"Waiting for a research worker (position {position})",
+            result={"position": position}
+        )
+    if status := job_status.get(job_id):
+        return status_update(
+            status["status"],
+            message="Connected to status stream",
+            error=status["error"],
+            result=status["result"]
+        )
+    return None
+
 @app.websocket("/research/ws/{job_id}")
-async def websocket_endpoint(websocket: WebSocket, job_id: str):
+async def websocket_endpoint(websocket: WebSocket, job_id: str, last_event_id: Optional[int] = None):
     try:
         await websocket.accept()
-        await manager.connect(websocket, job_id)
-
-        if job_id in job_status:
-            status = job_status[job_id]
-            await manager.send_status_update(
-                job_id,
-                status=status["status"],
-                message="Connected to status stream",
-                error=status["error"],
-                result=status["result"]
-            )
+        # Events the client missed are replayed from the job's history, so it may connect late
+        snapshot = connection_snapshot(job_id) if last_event_id is None else None
+        await manager.connect(websocket, job_id, last_event_id, snapshot=snapshot)
 
         while True:
             try:
@@ -218,11 +371,45 @@ async def websocket_endpoint(websocket: WebSocket, job_id: str):
         logger.error(f"WebSocket error for job {job_id}: {str(e)}", exc_info=True)
         manager.disconnect(websocket, job_id)
 
+# Idle seconds before an SSE comment line keeps the connection alive
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+@app.get("/research/{job_id}/events")
+async def stream_research_events(
+    job_id: str,
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID")
+):
+    """One-way server-sent event stream of a job's status updates.
+
+    Carries the same events as the WebSocket. Reconnecting clients resume from
+    the Last-Event-ID header (or ?last_event_id=) and are replayed what they
+    missed; the stream ends after the job completes or fails.
+    """
+    if last_event_id_header is not None:
+        last_event_id = last_event_id_header
+    status = job_status.get(job_id)
+    if not status and job_id not in manager.history:
+        raise HTTPException(status_code=404, detail="Research job not found")
+
+    snapshot = None
+    if last_event_id is None:
+        snapshot = connection_snapshot(job_id)
+    elif status and status["status"] in ("completed", "failed") and not manager.history.since(job_id, last_event_id):
+        # Finished and nothing missed: 204 tells EventSource not to reconnect
+        return Response(status_code=204)
+
+    return StreamingResponse(
+        manager.stream(job_id, last_event_id, heartbeat=SSE_HEARTBEAT_SECONDS, snapshot=snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/research/{job_id}")
 async def get_research(job_id: str):
     if not mongodb:
         raise HTTPException(status_code=501, detail="Database persistence not configured")
-    job = mongodb.get_job(job_id)
+    job = await mongodb.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Research job not found")
     return job
@@ -230,13 +417,12 @@ async def get_research(job_id: str):
 @app.get("/research/{job_id}/report")
 async def get_research_report(job_id: str):
     if not mongodb:
-        if job_id in job_status:
-            result = job_status[job_id]
+        if result := job_status.get(job_id):
             if report := result.get("report"):
                 return {"report": report}
         raise HTTPException(status_code=404, detail="Report not found")
     
-    report = mongodb.get_report(job_id)
+    report = await mongodb.get_report(job_id)
     if not report:
         raise HTTPException(status_code=404, detail="Research report not found")
     return report
@@ -275,7 +461,7 @@ async def serve_frontend():
 async def serve_react_spa(full_path: str):
     """Serve the React app for client-side routing."""
     # Let API routes be handled by their specific endpoints
-    if full_path.startswith(("research", "generate-pdf", "docs", "redoc", "openapi.json", "assets", "static")):
+    if full_path.startswith(("research", "admin", "generate-pdf", "docs", "redoc", "openapi.json", "assets", "static")):
         raise HTTPException(status_code=404, detail="Not found")
     
     # For all other routes, serve the React app
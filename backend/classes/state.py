@@ -9,9 +9,11 @@ class InputState(TypedDict, total=False):
     industry: NotRequired[str]
     websocket_manager: NotRequired[WebSocketManager]
     job_id: NotRequired[str]
+    planning_mode: NotRequired[str]
 
 class ResearchState(InputState):
     site_scrape: Dict[str, Any]
+    query_plan: Dict[str, List[str]]
     messages: List[Any]
     financial_data: Dict[str, Any]
     news_data: Dict[str, Any]
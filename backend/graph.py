@@ -1,5 +1,6 @@
 import logging
-from typing import Any, AsyncIterator, Dict
+from functools import lru_cache, wraps
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
 
 from langchain_core.messages import SystemMessage
 from langgraph.graph import StateGraph
@@ -11,18 +12,108 @@ from .nodes.collector import Collector
 from .nodes.curator import Curator
 from .nodes.editor import Editor
 from .nodes.enricher import Enricher
+from .nodes.query_planner import QueryPlanner
 from .nodes.researchers import (
     CompanyAnalyzer,
     FinancialAnalyst,
     IndustryAnalyzer,
     NewsScanner,
 )
+from .services.metrics import current_job, metrics
 
 logger = logging.getLogger(__name__)
 
+RESEARCH_NODES = [
+    "financial_analyst",
+    "news_scanner",
+    "industry_analyst",
+    "company_analyst"
+]
+
+
+@lru_cache(maxsize=1)
+def get_nodes() -> Dict[str, Any]:
+    """Instantiate the workflow nodes once per process.
+
+    Nodes hold only long-lived clients and configuration; everything that is
+    specific to a job (company, job_id, websocket_manager) travels through the
+    graph state, so a single instance of each node is shared by all jobs.
+    """
+    logger.info("Initializing workflow nodes")
+    researchers = {
+        "financial_analyst": FinancialAnalyst(),
+        "news_scanner": NewsScanner(),
+        "industry_analyst": IndustryAnalyzer(),
+        "company_analyst": CompanyAnalyzer(),
+    }
+    return {
+        "grounding": GroundingNode(),
+        "query_planner": QueryPlanner(list(researchers.values())),
+        **researchers,
+        "collector": Collector(),
+        "curator": Curator(),
+        "enricher": Enricher(),
+        "briefing": Briefing(),
+        "editor": Editor(),
+    }
+
+
+def timed_node(name: str, run: Callable[[Any], Awaitable[Any]]) -> Callable[[Any], Awaitable[Any]]:
+    """Wrap a node's run so its wall time is recorded and its upstream calls are attributed to the job."""
+    # wraps keeps the state annotation LangGraph reads to pick the node's input channels
+    @wraps(run)
+    async def timed_run(state):
+        job_id = state.get('job_id')
+        # Not reset afterwards: LangGraph may resume the node in a copy of the context
+        current_job.set(job_id)
+        with metrics.timer("node", name, job_id):
+            return await run(state)
+    return timed_run
+
+
+def build_workflow(nodes: Dict[str, Any]) -> StateGraph:
+    """Configure the state graph workflow"""
+    workflow = StateGraph(InputState)
+
+    # Add nodes with their respective processing functions
+    for name, node in nodes.items():
+        workflow.add_node(name, timed_node(name, node.run))
+
+    # Configure workflow edges
+    workflow.set_entry_point("grounding")
+    workflow.set_finish_point("editor")
+
+    # Plan every analyst's queries once, then fan out to the research nodes
+    workflow.add_edge("grounding", "query_planner")
+    for node in RESEARCH_NODES:
+        workflow.add_edge("query_planner", node)
+        workflow.add_edge(node, "collector")
+
+    # Connect remaining nodes
+    workflow.add_edge("collector", "curator")
+    workflow.add_edge("curator", "enricher")
+    workflow.add_edge("enricher", "briefing")
+    workflow.add_edge("briefing", "editor")
+
+    return workflow
+
+
+@lru_cache(maxsize=1)
+def get_compiled_graph():
+    """Return the process-wide compiled workflow, building it on first use."""
+    logger.info("Compiling research workflow")
+    return build_workflow(get_nodes()).compile()
+
+
 class Graph:
+    """Per-job handle on the shared compiled workflow.
+
+    Creating a Graph only builds the job's input state; nodes and the compiled
+    workflow are created once per process by get_compiled_graph().
+    """
+
     def __init__(self, company=None, url=None, hq_location=None, industry=None,
-                 websocket_manager=None, job_id=None):
+                 websocket_manager=None, job_id=None, planning_mode=None):
         self.websocket_manager = websocket_manager
         self.job_id = job_id
         
@@ -34,69 +125,15 @@ class Graph:
             industry=industry,
             websocket_manager=websocket_manager,
             job_id=job_id,
+            planning_mode=planning_mode,
             messages=[
                 SystemMessage(content="Expert researcher starting investigation")
             ]
         )
 
-        # Initialize nodes with WebSocket manager and job ID
-        self._init_nodes()
-        self._build_workflow()
-
-    def _init_nodes(self):
-        """Initialize all workflow nodes"""
-        self.ground = GroundingNode()
-        self.financial_analyst = FinancialAnalyst()
-        self.news_scanner = NewsScanner()
-        self.industry_analyst = IndustryAnalyzer()
-        self.company_analyst = CompanyAnalyzer()
-        self.collector = Collector()
-        self.curator = Curator()
-        self.enricher = Enricher()
-        self.briefing = Briefing()
-        self.editor = Editor()
-
-    def _build_workflow(self):
-        """Configure the state graph workflow"""
-        self.workflow = StateGraph(InputState)
-        
-        # Add nodes with their respective processing functions
-        self.workflow.add_node("grounding", self.ground.run)
-        self.workflow.add_node("financial_analyst", self.financial_analyst.run)
-        self.workflow.add_node("news_scanner", self.news_scanner.run)
-        self.workflow.add_node("industry_analyst", self.industry_analyst.run)
-        self.workflow.add_node("company_analyst", self.company_analyst.run)
-        self.workflow.add_node("collector", self.collector.run)
-        self.workflow.add_node("curator", self.curator.run)
-        self.workflow.add_node("enricher", self.enricher.run)
-        self.workflow.add_node("briefing", self.briefing.run)
-        self.workflow.add_node("editor", self.editor.run)
-
-        # Configure workflow edges
-        self.workflow.set_entry_point("grounding")
-        self.workflow.set_finish_point("editor")
-        
-        research_nodes = [
-            "financial_analyst", 
-            "news_scanner",
-            "industry_analyst", 
-            "company_analyst"
-        ]
-
-        # Connect grounding to all research nodes
-        for node in research_nodes:
-            self.workflow.add_edge("grounding", node)
-            self.workflow.add_edge(node, "collector")
-
-        # Connect remaining nodes
-        self.workflow.add_edge("collector", "curator")
-        self.workflow.add_edge("curator", "enricher")
-        self.workflow.add_edge("enricher", "briefing")
-        self.workflow.add_edge("briefing", "editor")
-
     async def run(self, thread: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
         """Execute the research workflow"""
-        compiled_graph = self.workflow.compile()
+        compiled_graph = get_compiled_graph()
         
         async for state in compiled_graph.astream(
             self.input_state,
@@ -122,5 +159,4 @@ class Graph:
         )
     
     def compile(self):
-        graph = self.workflow.compile()
-        return graph
\ No newline at end of file
+        return get_compiled_graph()
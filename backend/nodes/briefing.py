@@ -3,9 +3,9 @@ import logging
 import os
 from typing import Any, Dict, List, Union
 
-import google.generativeai as genai
-
 from ..classes import ResearchState
+from ..services.clients import clients
+from ..services.concurrency import limiters
 
 logger = logging.getLogger(__name__)
 
@@ -14,13 +14,9 @@ class Briefing:
     
     def __init__(self) -> None:
         self.max_doc_length = 8000  # Maximum document content length
-        self.gemini_key = os.getenv("GEMINI_API_KEY")
-        if not self.gemini_key:
-            raise ValueError("GEMINI_API_KEY environment variable is not set")
-        
-        # Configure Gemini
-        genai.configure(api_key=self.gemini_key)
-        self.gemini_model = genai.GenerativeModel('gemini-2.0-flash')
+        self.gemini_model = clients.gemini('gemini-2.0-flash')
+        # Maximum concurrent briefing LLM calls per job
+        self.max_concurrency = int(os.getenv("BRIEFING_CONCURRENCY", "2"))
 
     async def generate_category_briefing(
         self, docs: Union[Dict[str, Any], List[Dict[str, Any]]], 
@@ -281,7 +277,9 @@ Analyze the following documents and extract key information. Focus on database,
         
         try:
             logger.info("Sending prompt to LLM")
-            response = self.gemini_model.generate_content(prompt)
+            # Use the async API so the event loop keeps serving other jobs during the call
+            async with limiters.slot("gemini"):
+                response = await self.gemini_model.generate_content_async(prompt)
             content = response.text.strip()
             if not content:
                 logger.error(f"Empty response from LLM for {category} briefing")
@@ -362,7 +360,7 @@ Analyze the following documents and extract key information. Focus on database,
         # Process briefings in parallel with rate limiting
         if briefing_tasks:
             # Rate limiting semaphore for LLM API
-            briefing_semaphore = asyncio.Semaphore(2)  # Limit to 2 concurrent briefings
+            briefing_semaphore = asyncio.Semaphore(self.max_concurrency)
             
             async def process_briefing(task: Dict[str, Any]) -> Dict[str, Any]:
                 """Process a single briefing with rate limiting."""
@@ -1,11 +1,11 @@
 import logging
-import os
 from typing import Any, Dict
 
 from langchain_core.messages import AIMessage
-from openai import AsyncOpenAI
 
 from ..classes import ResearchState
+from ..services.clients import clients
+from ..services.concurrency import limiters
 from ..utils.references import format_references_section
 
 logger = logging.getLogger(__name__)
@@ -15,31 +15,12 @@ class Editor:
     """Compiles individual section briefings into a cohesive final report."""
     
     def __init__(self) -> None:
-        self.openai_key = os.getenv("OPENAI_API_KEY")
-        if not self.openai_key:
-            raise ValueError("OPENAI_API_KEY environment variable is not set")
-        
-        # Configure OpenAI
-        self.openai_client = AsyncOpenAI(api_key=self.openai_key)
-        
-        # Initialize context dictionary for use across methods
-        self.context = {
-            "company": "Unknown Company",
-            "industry": "Unknown",
-            "hq_location": "Unknown"
-        }
+        self.openai_client = clients.openai()
 
     async def compile_briefings(self, state: ResearchState) -> ResearchState:
         """Compile individual briefing categories from state into a final report."""
         company = state.get('company', 'Unknown Company')
         
-        # Update context with values from state
-        self.context = {
-            "company": company,
-            "industry": state.get('industry', 'Unknown'),
-            "hq_location": state.get('hq_location', 'Unknown')
-        }
-        
         # Send initial compilation status
         if websocket_manager := state.get('websocket_manager'):
             if job_id := state.get('job_id'):
@@ -109,7 +90,7 @@ class Editor:
     async def edit_report(self, state: ResearchState, briefings: Dict[str, str], context: Dict[str, Any]) -> str:
         """Compile section briefings into a final report and update the state."""
         try:
-            company = self.context["company"]
+            company = context["company"]
             
             # Step 1: Initial Compilation
             if websocket_manager := state.get('websocket_manager'):
@@ -124,7 +105,7 @@ class Editor:
                         }
                     )
 
-            edited_report = await self.compile_content(state, briefings, company)
+            edited_report = await self.compile_content(state, briefings, context)
             if not edited_report:
                 logger.error("Initial compilation failed")
                 return ""
@@ -154,7 +135,7 @@ class Editor:
                             "substep": "format"
                         }
                     )
-            final_report = await self.content_sweep(state, edited_report, company)
+            final_report = await self.content_sweep(state, edited_report, context)
             
             final_report = final_report or ""
             
@@ -194,7 +175,7 @@ class Editor:
             logger.error(f"Error in edit_report: {e}")
             return ""
     
-    async def compile_content(self, state: ResearchState, briefings: Dict[str, str], company: str) -> str:
+    async def compile_content(self, state: ResearchState, briefings: Dict[str, str], context: Dict[str, Any]) -> str:
         """Initial compilation of research sections."""
         combined_content = "\n\n".join(content for content in briefings.values())
         
@@ -214,10 +195,10 @@ class Editor:
             reference_text = format_references_section(references, reference_info, reference_titles)
             logger.info(f"Added {len(references)} references during compilation")
         
-        # Use values from centralized context
-        company = self.context["company"]
-        industry = self.context["industry"]
-        hq_location = self.context["hq_location"]
+        # Use values from the job's context (the node is shared across jobs)
+        company = context["company"]
+        industry = context["industry"]
+        hq_location = context["hq_location"]
         
         prompt = f"""You are compiling a comprehensive research report about {company}.
 
@@ -265,21 +246,22 @@ Strictly enforce this EXACT document structure:
 Return the report in clean markdown format. No explanations or commentary."""
         
         try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4.1",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert report editor that compiles research briefings into comprehensive company reports."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0,
-                stream=False
-            )
+            async with limiters.slot("openai"):
+                response = await self.openai_client.chat.completions.create(
+                    model="gpt-4.1",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are an expert report editor that compiles research briefings into comprehensive company reports."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=0,
+                    stream=False
+                )
             initial_report = response.choices[0].message.content.strip()
             
             # Append the references section after LLM processing
@@ -291,12 +273,12 @@ Return the report in clean markdown format. No explanations or commentary."""
             logger.error(f"Error in initial compilation: {e}")
             return (combined_content or "").strip()
         
-    async def content_sweep(self, state: ResearchState, content: str, company: str) -> str:
+    async def content_sweep(self, state: ResearchState, content: str, context: Dict[str, Any]) -> str:
         """Sweep the content for any redundant information."""
-        # Use values from centralized context
-        company = self.context["company"]
-        industry = self.context["industry"]
-        hq_location = self.context["hq_location"]
+        # Use values from the job's context (the node is shared across jobs)
+        company = context["company"]
+        industry = context["industry"]
+        hq_location = context["hq_location"]
         
         prompt = f"""You are an expert briefing editor. You are given a report on {company}.
 
@@ -380,50 +362,33 @@ Critical rules:
 Return the transformed report in clean markdown format. No explanations or commentary."""
         
         try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4.1-mini", 
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at creating MongoDB account intelligence reports that help sales teams identify opportunities and craft effective messaging strategies."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0,
-                stream=True
-            )
+            # Hold the OpenAI slot until the stream is drained
+            async with limiters.slot("openai"):
+                response = await self.openai_client.chat.completions.create(
+                    model="gpt-4.1-mini", 
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are an expert at creating MongoDB account intelligence reports that help sales teams identify opportunities and craft effective messaging strategies."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=0,
+                    stream=True
+                )
             
-            accumulated_text = ""
-            buffer = ""
+                accumulated_text = ""
+                buffer = ""
             
-            async for chunk in response:
-                if chunk.choices[0].finish_reason == "stop":
-                    websocket_manager = state.get('websocket_manager')
-                    if websocket_manager and buffer:
-                        job_id = state.get('job_id')
-                        if job_id:
-                            await websocket_manager.send_status_update(
-                                job_id=job_id,
-                                status="report_chunk",
-                                message="Formatting final report",
-                                result={
-                                    "chunk": buffer,
-                                    "step": "Editor"
-                                }
-                            )
-                    break
-                    
-                chunk_text = chunk.choices[0].delta.content
-                if chunk_text:
-                    accumulated_text += chunk_text
-                    buffer += chunk_text
-                    
-                    if any(char in buffer for char in ['.', '!', '?', '\n']) and len(buffer) > 10:
-                        if websocket_manager := state.get('websocket_manager'):
-                            if job_id := state.get('job_id'):
+                async for chunk in response:
+                    if chunk.choices[0].finish_reason == "stop":
+                        websocket_manager = state.get('websocket_manager')
+                        if websocket_manager and buffer:
+                            job_id = state.get('job_id')
+                            if job_id:
                                 await websocket_manager.send_status_update(
                                     job_id=job_id,
                                     status="report_chunk",
@@ -433,7 +398,26 @@ Return the transformed report in clean markdown format. No explanations or comme
                                         "step": "Editor"
                                     }
                                 )
-                        buffer = ""
+                        break
+                    
+                    chunk_text = chunk.choices[0].delta.content
+                    if chunk_text:
+                        accumulated_text += chunk_text
+                        buffer += chunk_text
+                    
+                        if any(char in buffer for char in ['.', '!', '?', '\n']) and len(buffer) > 10:
+                            if websocket_manager := state.get('websocket_manager'):
+                                if job_id := state.get('job_id'):
+                                    await websocket_manager.send_status_update(
+                                        job_id=job_id,
+                                        status="report_chunk",
+                                        message="Formatting final report",
+                                        result={
+                                            "chunk": buffer,
+                                            "step": "Editor"
+                                        }
+                                    )
+                            buffer = ""
             
             return (accumulated_text or "").strip()
         except Exception as e:
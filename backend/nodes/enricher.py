@@ -1,27 +1,107 @@
 import asyncio
-import os
-from typing import Dict, List
+import logging
+from typing import Any, Dict, List
 
 from langchain_core.messages import AIMessage
-from tavily import AsyncTavilyClient
 
 from ..classes import ResearchState
+from ..services.clients import clients
+from ..services.concurrency import limiters
+from ..services.content_store import canonical_url, get_content_store
+from ..services.domain_breaker import get_domain_breaker
+
+logger = logging.getLogger(__name__)
+
+
+class _ExtractionRegistry:
+    """Per-job map from canonical URL to its one extraction, shared across categories.
+
+    The first category to claim a URL fetches it; later claims wait for that
+    result instead of extracting the page again.
+    """
+
+    def __init__(self) -> None:
+        self._results: Dict[str, asyncio.Future] = {}
+        self.duplicates_avoided = 0
+
+    def seed(self, url: str, content: str) -> None:
+        """Register content the job already has, e.g. the grounding site scrape."""
+        key = canonical_url(url)
+        if content and key not in self._results:
+            self._results[key] = asyncio.get_running_loop().create_future()
+            self._results[key].set_result(content)
+
+    def claim(self, urls: List[str]) -> List[str]:
+        """Return the URLs the caller must extract; the rest are already owned."""
+        owned = []
+        for url in urls:
+            key = canonical_url(url)
+            if key in self._results:
+                self.duplicates_avoided += 1
+                continue
+            self._results[key] = asyncio.get_running_loop().create_future()
+            owned.append(url)
+        return owned
+
+    def resolve(self, urls: List[str], contents: Dict[str, Any]) -> None:
+        """Publish the outcome for claimed URLs, failing any without a result."""
+        for url in urls:
+            future = self._results[canonical_url(url)]
+            if not future.done():
+                future.set_result(contents.get(url, {'error': 'Extraction did not complete'}))
+
+    async def wait(self, urls: List[str]) -> Dict[str, Any]:
+        return {url: await self._results[canonical_url(url)] for url in urls}
 
 
 class Enricher:
     """Enriches curated documents with raw content."""
     
     def __init__(self) -> None:
-        tavily_key = os.getenv("TAVILY_API_KEY")
-        if not tavily_key:
-            raise ValueError("TAVILY_API_KEY environment variable is not set")
-        self.tavily_client = AsyncTavilyClient(api_key=tavily_key)
+        self.tavily_client = clients.tavily()
+        self.content_store = get_content_store()
+        self.domain_breaker = get_domain_breaker()
         self.batch_size = 20
 
-    async def fetch_single_content(self, url: str, websocket_manager=None, job_id=None, category=None) -> Dict[str, str]:
-        """Fetch raw content for a single URL."""
-        try:
-            if websocket_manager and job_id:
+    async def _send_extraction_result(self, url: str, content, websocket_manager=None, job_id=None, category=None) -> None:
+        """Report the outcome of one URL's extraction."""
+        if not (websocket_manager and job_id):
+            return
+        if isinstance(content, dict):
+            error_msg = content.get('error', 'Unknown error')
+            await websocket_manager.send_status_update(
+                job_id=job_id,
+                status="extraction_error",
+                message=f"Failed to extract content from {url}: {error_msg}",
+                result={
+                    "step": "Enriching",
+                    "url": url,
+                    "category": category,
+                    "success": False,
+                    "error": error_msg
+                }
+            )
+        elif content:
+            await websocket_manager.send_status_update(
+                job_id=job_id,
+                status="extracted",
+                message=f"Successfully extracted content from {url}",
+                result={
+                    "step": "Enriching",
+                    "url": url,
+                    "category": category,
+                    "success": True
+                }
+            )
+
+    async def fetch_batch_content(self, urls: List[str], websocket_manager=None, job_id=None, category=None) -> Dict[str, Any]:
+        """Extract raw content for up to batch_size URLs in a single Tavily request.
+
+        Returns the content string for each URL, or {'error': message} for URLs
+        that failed individually or whose whole request failed.
+        """
+        if websocket_manager and job_id:
+            for url in urls:
                 await websocket_manager.send_status_update(
                     job_id=job_id,
                     status="extracting",
@@ -33,43 +113,90 @@ class Enricher:
                     }
                 )
 
-            result = await self.tavily_client.extract(url)
-            if result and result.get('results'):
+        try:
+            async with limiters.slot("tavily_extract"):
+                response = await self.tavily_client.extract(urls)
+        except Exception as e:
+            logger.error(f"Error extracting batch of {len(urls)} URLs: {e}")
+            contents = {url: {'error': str(e)} for url in urls}
+        else:
+            # Tavily may echo URLs in a slightly different form, so match on canonical URLs
+            by_canonical: Dict[str, List[str]] = {}
+            for url in urls:
+                by_canonical.setdefault(canonical_url(url), []).append(url)
+            contents = {url: '' for url in urls}
+            for item in response.get('results', []):
+                for url in by_canonical.get(canonical_url(item.get('url', '')), []):
+                    contents[url] = item.get('raw_content') or ''
+            for item in response.get('failed_results', []):
+                for url in by_canonical.get(canonical_url(item.get('url', '')), []):
+                    contents[url] = {'error': item.get('error') or 'Extraction failed'}
+
+            # Only per-URL outcomes say anything about a domain; a failed request does not
+            if self.domain_breaker:
+                for url, content in contents.items():
+                    if isinstance(content, dict):
+                        self.domain_breaker.record_failure(url, content['error'])
+                    elif content:
+                        self.domain_breaker.record_success(url)
+
+        for url, content in contents.items():
+            await self._send_extraction_result(url, content, websocket_manager, job_id, category)
+        return contents
+
+    async def fetch_raw_content(self, urls: List[str], websocket_manager=None, job_id=None, category=None) -> Dict[str, Any]:
+        """Fetch raw content for multiple URLs in parallel batches.
+
+        Only content store misses are extracted, and URLs on domains the circuit
+        breaker has tripped (or that failed recently) are skipped without a request.
+        """
+        raw_contents = {}
+        if self.content_store:
+            stored = await self.content_store.get_many(urls)
+            for url, content in stored.items():
+                raw_contents[url] = content
                 if websocket_manager and job_id:
                     await websocket_manager.send_status_update(
                         job_id=job_id,
                         status="extracted",
-                        message=f"Successfully extracted content from {url}",
+                        message=f"Loaded stored content for {url}",
                         result={
                             "step": "Enriching",
                             "url": url,
                             "category": category,
-                            "success": True
+                            "success": True,
+                            "cached": True
                         }
                     )
-                return {url: result['results'][0].get('raw_content', '')}
-        except Exception as e:
-            print(f"Error fetching raw content for {url}: {e}")
-            error_msg = str(e)
-            if websocket_manager and job_id:
-                await websocket_manager.send_status_update(
-                    job_id=job_id,
-                    status="extraction_error",
-                    message=f"Failed to extract content from {url}: {error_msg}",
-                    result={
-                        "step": "Enriching",
-                        "url": url,
-                        "category": category,
-                        "success": False,
-                        "error": error_msg
-                    }
-                )
-            return {url: '', "error": error_msg}
-        return {url: ''}
+            urls = [url for url in urls if url not in stored]
+
+        if self.domain_breaker:
+            remaining = []
+            for url in urls:
+                if reason := self.domain_breaker.check(url):
+                    raw_contents[url] = {'error': reason, 'skipped': True}
+                    if websocket_manager and job_id:
+                        # Reported as an extraction error so clients count the URL as done
+                        await websocket_manager.send_status_update(
+                            job_id=job_id,
+                            status="extraction_error",
+                            message=f"Skipped {url}: {reason}",
+                            result={
+                                "step": "Enriching",
+                                "url": url,
+                                "category": category,
+                                "success": False,
+                                "error": reason,
+                                "skipped": True
+                            }
+                        )
+                else:
+                    remaining.append(url)
+            urls = remaining
+
+        if not urls:
+            return raw_contents
 
-    async def fetch_raw_content(self, urls: List[str], websocket_manager=None, job_id=None, category=None) -> Dict[str, str]:
-        """Fetch raw content for multiple URLs in parallel."""
-        raw_contents = {}
         total_batches = (len(urls) + self.batch_size - 1) // self.batch_size
 
         # Create batches
@@ -78,7 +205,7 @@ class Enricher:
         # Process batches in parallel with rate limiting
         semaphore = asyncio.Semaphore(3)  # Limit concurrent batches to 3
         
-        async def process_batch(batch_num: int, batch_urls: List[str]) -> Dict[str, str]:
+        async def process_batch(batch_num: int, batch_urls: List[str]) -> Dict[str, Any]:
             async with semaphore:
                 if websocket_manager and job_id:
                     await websocket_manager.send_status_update(
@@ -93,16 +220,8 @@ class Enricher:
                         }
                     )
 
-                # Process URLs in batch concurrently
-                tasks = [self.fetch_single_content(url, websocket_manager, job_id, category) for url in batch_urls]
-                results = await asyncio.gather(*tasks)
-                
-                # Combine results from batch
-                batch_contents = {}
-                for result in results:
-                    batch_contents.update(result)
-                
-                return batch_contents
+                # Extract the whole batch in one request
+                return await self.fetch_batch_content(batch_urls, websocket_manager, job_id, category)
 
         # Process all batches
         batch_results = await asyncio.gather(*[
@@ -111,8 +230,16 @@ class Enricher:
         ])
 
         # Combine results from all batches
+        fetched = {}
         for batch_result in batch_results:
-            raw_contents.update(batch_result)
+            fetched.update(batch_result)
+
+        if self.content_store:
+            await self.content_store.put_many({
+                url: content for url, content in fetched.items()
+                if url in urls and isinstance(content, str) and content
+            })
+        raw_contents.update(fetched)
 
         return raw_contents
 
@@ -143,6 +270,15 @@ class Enricher:
             'company_data': ('🏢 Company', 'company')
         }
 
+        # Each canonical URL is extracted once per job, whichever categories it appears in
+        registry = _ExtractionRegistry()
+        if company_url := state.get('company_url'):
+            registry.seed(company_url, (state.get('site_scrape') or {}).get('raw_content', ''))
+        for data_field in data_types:
+            for url, doc in (state.get(f'curated_{data_field}') or {}).items():
+                if isinstance(doc.get('raw_content'), str):
+                    registry.seed(url, doc['raw_content'])
+
         # Create tasks for parallel processing
         enrichment_tasks = []
         for data_field, (label, category) in data_types.items():
@@ -181,19 +317,29 @@ class Enricher:
                 'category': category,
                 'label': label,
                 'docs': docs_needing_content,
-                'curated_docs': curated_docs
+                'curated_docs': curated_docs,
+                'fetch_urls': registry.claim(list(docs_needing_content.keys()))
             })
 
         # Process all categories in parallel
         if enrichment_tasks:
             async def process_category(task):
+                fetched = {}
                 try:
-                    raw_contents = await self.fetch_raw_content(
-                        list(task['docs'].keys()),
+                    fetched = await self.fetch_raw_content(
+                        task['fetch_urls'],
                         websocket_manager,
                         job_id,
                         task['category']
                     )
+                except Exception as e:
+                    logger.error(f"Error extracting {task['category']} documents: {e}")
+                finally:
+                    # Categories sharing these URLs are waiting on the outcome
+                    registry.resolve(task['fetch_urls'], fetched)
+
+                try:
+                    raw_contents = await registry.wait(list(task['docs'].keys()))
                     
                     enriched_count = 0
                     error_count = 0
@@ -246,6 +392,8 @@ class Enricher:
             total_enriched = sum(r['enriched'] for r in results)
             total_documents = sum(r['total'] for r in results)
             total_errors = sum(r.get('errors', 0) for r in results)
+            if registry.duplicates_avoided:
+                msg.append(f"\n• Reused content for {registry.duplicates_avoided} URLs shared between categories")
 
             # Send final status update
             if websocket_manager and job_id:
@@ -261,7 +409,8 @@ class Enricher:
                         "step": "Enriching",
                         "total_enriched": total_enriched,
                         "total_documents": total_documents,
-                        "total_errors": total_errors
+                        "total_errors": total_errors,
+                        "duplicate_fetches_avoided": registry.duplicates_avoided
                     }
                 )
 
@@ -1,10 +1,10 @@
 import logging
-import os
 
 from langchain_core.messages import AIMessage
-from tavily import AsyncTavilyClient
 
 from ..classes import InputState, ResearchState
+from ..services.clients import clients
+from ..services.concurrency import limiters
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +12,7 @@ class GroundingNode:
     """Gathers initial grounding data about the company."""
     
     def __init__(self) -> None:
-        self.tavily_client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+        self.tavily_client = clients.tavily()
 
     async def initial_search(self, state: InputState) -> ResearchState:
         # Add debug logging at the start to check websocket manager
@@ -52,7 +52,8 @@ class GroundingNode:
 
             try:
                 logger.info("Initiating Tavily extraction")
-                site_extraction = await self.tavily_client.extract(url, extract_depth="basic")
+                async with limiters.slot("tavily_extract"):
+                    site_extraction = await self.tavily_client.extract(url, extract_depth="basic")
                 
                 raw_contents = []
                 for item in site_extraction.get("results", []):
@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import textwrap
+from datetime import datetime
+from typing import Any, Dict, List
+
+from langchain_core.messages import AIMessage
+
+from ..classes import ResearchState
+from ..services.clients import clients
+from ..services.concurrency import limiters
+from ..services.search_cache import normalize_query
+from .researchers.base import BaseResearcher
+
+logger = logging.getLogger(__name__)
+
+
+PLANNING_MODES = ("llm", "fast", "auto")
+
+
+class QueryPlanner:
+    """Plans every analyst's search queries in one step.
+
+    In "llm" mode the queries come from a single JSON completion; in "fast"
+    mode they are filled in from each analyst's query_templates with no LLM
+    call, and "auto" uses fast mode while OpenAI calls are queued behind the
+    concurrency limit. The mode is taken from state['planning_mode'], falling
+    back to QUERY_PLANNING_MODE.
+
+    The plan is stored in state['query_plan'], keyed by analyst_type, with
+    queries repeated across categories removed. Analysts whose category is
+    missing from the plan generate their own queries as before.
+    """
+
+    def __init__(self, researchers: List[BaseResearcher]) -> None:
+        self.openai_client = clients.openai()
+        self.researchers = researchers
+        self.enabled = os.getenv("QUERY_PLANNER", "on").lower() not in ("off", "false", "0")
+        self.default_mode = os.getenv("QUERY_PLANNING_MODE", "auto").lower()
+
+    def resolve_mode(self, state: ResearchState) -> str:
+        mode = (state.get('planning_mode') or self.default_mode).lower()
+        if mode == "auto":
+            return "fast" if limiters.get("openai").queue_depth else "llm"
+        return mode if mode in PLANNING_MODES else "llm"
+
+    def _build_prompt(self, state: ResearchState) -> str:
+        company = state.get('company', 'Unknown Company')
+        industry = state.get('industry', 'Unknown Industry')
+        hq = state.get('hq_location', 'Unknown HQ')
+        sections = "\n\n".join(
+            f'"{researcher.analyst_type}":\n'
+            f'{textwrap.dedent(researcher.query_prompt).strip().format(company=company, industry=industry)}'
+            for researcher in self.researchers
+        )
+        max_queries = max(researcher.max_queries for researcher in self.researchers)
+        example = ", ".join(f'"{researcher.analyst_type}": ["..."]' for researcher in self.researchers)
+        return f"""Researching {company} (headquartered in {hq}) on {datetime.now().strftime("%B %d, %Y")}.
+Plan web search queries for each of these research categories:
+
+{sections}
+
+Important Guidelines:
+- Focus ONLY on {company}-specific information
+- Make queries very brief and to the point
+- Provide exactly {max_queries} search queries per category, with no hyphens or dashes
+- Do not repeat the same query in more than one category
+- DO NOT make assumptions about the industry - use only the provided industry information
+
+Return a JSON object mapping each category to its list of queries: {{{example}}}"""
+
+    def _dedupe_plan(self, raw_plan: Dict[str, Any]) -> Dict[str, List[str]]:
+        """Keep each category's queries in order, dropping any already planned for another category."""
+        plan = {}
+        seen = set()
+        for researcher in self.researchers:
+            queries = raw_plan.get(researcher.analyst_type)
+            if not isinstance(queries, list):
+                continue
+            unique = []
+            for query in queries:
+                if not isinstance(query, str) or not query.strip():
+                    continue
+                key = normalize_query(query)
+                if key in seen:
+                    continue
+                seen.add(key)
+                unique.append(query.strip())
+            if unique:
+                plan[researcher.analyst_type] = unique[:researcher.max_queries]
+        return plan
+
+    def template_plan(self, state: ResearchState) -> Dict[str, List[str]]:
+        company = state.get('company', 'Unknown Company')
+        year = datetime.now().year
+        return self._dedupe_plan({
+            researcher.analyst_type: researcher._fallback_queries(
+                company, year, state.get('industry'), state.get('hq_location')
+            )
+            for researcher in self.researchers
+        })
+
+    async def plan_queries(self, state: ResearchState, mode: str = "llm") -> Dict[str, Any]:
+        company = state.get('company', 'Unknown Company')
+        websocket_manager = state.get('websocket_manager')
+        job_id = state.get('job_id')
+
+        if websocket_manager and job_id:
+            await websocket_manager.send_status_update(
+                job_id=job_id,
+                status="processing",
+                message=f"Planning research queries for {company}",
+                result={
+                    "step": "Query Planning",
+                    "mode": mode
+                }
+            )
+
+        if mode == "fast":
+            plan = self.template_plan(state)
+        else:
+            plan = await self.llm_plan(state)
+
+        total = sum(len(queries) for queries in plan.values())
+        logger.info(f"Planned {total} queries across {len(plan)} categories for {company} ({mode} mode)")
+        msg = f"🗺️ Planned {total} search queries across {len(plan)} research categories ({mode} mode)"
+        messages = state.get('messages', [])
+        messages.append(AIMessage(content=msg))
+
+        return {
+            'messages': messages,
+            'query_plan': plan
+        }
+
+    async def llm_plan(self, state: ResearchState) -> Dict[str, List[str]]:
+        company = state.get('company', 'Unknown Company')
+        industry = state.get('industry', 'Unknown Industry')
+        try:
+            async with limiters.slot("openai"):
+                response = await self.openai_client.chat.completions.create(
+                    model="gpt-4.1-mini",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": f"You are researching {company}, a company in the {industry} industry."
+                        },
+                        {
+                            "role": "user",
+                            "content": self._build_prompt(state)
+                        }
+                    ],
+                    temperature=0,
+                    max_tokens=2048,
+                    response_format={"type": "json_object"}
+                )
+            return self._dedupe_plan(json.loads(response.choices[0].message.content))
+        except Exception as e:
+            logger.error(f"Query planning failed for {company}, analysts will generate their own queries: {e}")
+            return {}
+
+    async def run(self, state: ResearchState) -> Dict[str, Any]:
+        mode = self.resolve_mode(state)
+        if mode != "fast" and not self.enabled:
+            return {'query_plan': {}}
+        return await self.plan_queries(state, mode)
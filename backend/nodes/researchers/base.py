@@ -2,27 +2,42 @@ import asyncio
 import logging
 import os
 from datetime import datetime
-from typing import Any, Dict, List
-
-from openai import AsyncOpenAI
-from tavily import AsyncTavilyClient
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from ...classes import ResearchState
+from ...services.clients import clients
+from ...services.concurrency import hedged, limiters
+from ...services.search_cache import get_search_cache
 from ...utils.references import clean_title
 
 logger = logging.getLogger(__name__)
 
 class BaseResearcher:
+    max_queries = 4
+    # Instructions for this analyst's search queries; {company} and {industry} are placeholders
+    query_prompt = ""
+    # Queries used without an LLM in fast planning mode; {company}, {industry}, {hq} and {year} are placeholders.
+    # The first max_queries are used, skipping those that need {industry} when it is unknown.
+    query_templates = [
+        "{company} overview {year}",
+        "{company} recent news {year}",
+        "{company} financial reports {year}",
+        "{company} industry analysis {year}"
+    ]
+    # Tavily search topic ("news", "finance"), which also picks the search cache TTL; None for general
+    search_topic = None
+
     def __init__(self):
-        tavily_key = os.getenv("TAVILY_API_KEY")
-        openai_key = os.getenv("OPENAI_API_KEY")
-        
-        if not tavily_key or not openai_key:
-            raise ValueError("Missing API keys")
-            
-        self.tavily_client = AsyncTavilyClient(api_key=tavily_key)
-        self.openai_client = AsyncOpenAI(api_key=openai_key)
+        self.tavily_client = clients.tavily()
+        self.openai_client = clients.openai()
+        self.search_cache = get_search_cache()
         self.analyst_type = "base_researcher"  # Default type
+        # Start each search as soon as its query is streamed rather than after generation
+        self.stream_searches = os.getenv("STREAM_QUERY_SEARCH", "true").lower() != "false"
+        # Seconds one Tavily search may take once it holds a concurrency slot
+        self.search_timeout = float(os.getenv("TAVILY_SEARCH_TIMEOUT", "20"))
+        # Re-send searches that outlive the p95 search latency and keep the first answer
+        self.hedge_searches = os.getenv("TAVILY_SEARCH_HEDGE", "false").lower() == "true"
 
     @property
     def analyst_type(self) -> str:
@@ -34,7 +49,15 @@ class BaseResearcher:
     def analyst_type(self, value: str):
         self._analyst_type = value
 
-    async def generate_queries(self, state: Dict, prompt: str) -> List[str]:
+    async def generate_queries(
+        self, state: Dict, prompt: str,
+        on_query: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> List[str]:
+        """Stream search queries from the LLM.
+
+        If on_query is given it is awaited with each query as soon as its line
+        is complete, before the rest of the completion has arrived.
+        """
         company = state.get("company", "Unknown Company")
         industry = state.get("industry", "Unknown Industry")
         hq = state.get("hq", "Unknown HQ")
@@ -45,72 +68,76 @@ class BaseResearcher:
         try:
             logger.info(f"Generating queries for {company} as {self.analyst_type}")
             
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are researching {company}, a company in the {industry} industry."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"""Researching {company} on {datetime.now().strftime("%B %d, %Y")}.
+            # Hold the OpenAI slot until the stream is drained
+            async with limiters.slot("openai"):
+                response = await self.openai_client.chat.completions.create(
+                    model="gpt-4.1-mini",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": f"You are researching {company}, a company in the {industry} industry."
+                        },
+                        {
+                            "role": "user",
+                            "content": f"""Researching {company} on {datetime.now().strftime("%B %d, %Y")}.
 {self._format_query_prompt(prompt, company, hq, current_year)}"""
-                    }
-                ],
-                temperature=0,
-                max_tokens=4096,
-                stream=True
-            )
+                        }
+                    ],
+                    temperature=0,
+                    max_tokens=4096,
+                    stream=True
+                )
             
-            queries = []
-            current_query = ""
-            current_query_number = 1
+                queries = []
+                current_query = ""
+                current_query_number = 1
 
-            async for chunk in response:
-                if chunk.choices[0].finish_reason == "stop":
-                    break
+                async for chunk in response:
+                    if chunk.choices[0].finish_reason == "stop":
+                        break
                     
-                content = chunk.choices[0].delta.content
-                if content:
-                    current_query += content
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        current_query += content
                     
-                    # Stream the current state to the UI.
-                    if websocket_manager and job_id:
-                        await websocket_manager.send_status_update(
-                            job_id=job_id,
-                            status="query_generating",
-                            message="Generating research query",
-                            result={
-                                "query": current_query,
-                                "query_number": current_query_number,
-                                "category": self.analyst_type,
-                                "is_complete": False
-                            }
-                        )
+                        # Stream the current state to the UI.
+                        if websocket_manager and job_id:
+                            await websocket_manager.send_status_update(
+                                job_id=job_id,
+                                status="query_generating",
+                                message="Generating research query",
+                                result={
+                                    "query": current_query,
+                                    "query_number": current_query_number,
+                                    "category": self.analyst_type,
+                                    "is_complete": False
+                                }
+                            )
                     
-                    # If a newline is detected, treat it as a complete query.
-                    if '\n' in current_query:
-                        parts = current_query.split('\n')
-                        current_query = parts[-1]  # The last part is the start of the next query.
+                        # If a newline is detected, treat it as a complete query.
+                        if '\n' in current_query:
+                            parts = current_query.split('\n')
+                            current_query = parts[-1]  # The last part is the start of the next query.
                         
-                        for query in parts[:-1]:
-                            query = query.strip()
-                            if query:
-                                queries.append(query)
-                                if websocket_manager and job_id:
-                                    await websocket_manager.send_status_update(
-                                        job_id=job_id,
-                                        status="query_generated",
-                                        message="Generated new research query",
-                                        result={
-                                            "query": query,
-                                            "query_number": len(queries),
-                                            "category": self.analyst_type,
-                                            "is_complete": True
-                                        }
-                                    )
-                                current_query_number += 1
+                            for query in parts[:-1]:
+                                query = query.strip()
+                                if query:
+                                    queries.append(query)
+                                    if websocket_manager and job_id:
+                                        await websocket_manager.send_status_update(
+                                            job_id=job_id,
+                                            status="query_generated",
+                                            message="Generated new research query",
+                                            result={
+                                                "query": query,
+                                                "query_number": len(queries),
+                                                "category": self.analyst_type,
+                                                "is_complete": True
+                                            }
+                                        )
+                                    if on_query:
+                                        await on_query(query)
+                                    current_query_number += 1
 
             # Add any remaining query (even if not newline terminated)
             if current_query.strip():
@@ -128,6 +155,8 @@ class BaseResearcher:
                             "is_complete": True
                         }
                     )
+                if on_query:
+                    await on_query(query)
                 current_query_number += 1
             
             logger.info(f"Generated {len(queries)} queries for {self.analyst_type}: {queries}")
@@ -135,8 +164,8 @@ class BaseResearcher:
             if not queries:
                 raise ValueError(f"No queries generated for {company}")
 
-            # Limit to at most 4 queries.
-            queries = queries[:4]
+            # Limit to at most max_queries queries.
+            queries = queries[:self.max_queries]
             logger.info(f"Final queries for {self.analyst_type}: {queries}")
             
             return queries
@@ -152,6 +181,104 @@ class BaseResearcher:
                 )
             return []
 
+    async def _announce_planned_queries(self, queries: List[str], websocket_manager=None, job_id=None) -> None:
+        """Report queries from the query plan the way streamed queries are reported."""
+        if not (websocket_manager and job_id):
+            return
+        for query_number, query in enumerate(queries, start=1):
+            for status in ("query_generating", "query_generated"):
+                await websocket_manager.send_status_update(
+                    job_id=job_id,
+                    status=status,
+                    message="Planned research query",
+                    result={
+                        "query": query,
+                        "query_number": query_number,
+                        "category": self.analyst_type,
+                        "is_complete": status == "query_generated"
+                    }
+                )
+
+    async def research(self, state: ResearchState, prompt: Optional[str] = None) -> Tuple[List[str], Dict[str, Any]]:
+        """Find documents for this analyst, returning its queries and the merged results.
+
+        Queries come from the job's query plan when the planner produced them
+        for this analyst; otherwise they are generated from prompt (default
+        query_prompt). With stream_searches enabled each generated query is
+        sent to Tavily the moment the LLM finishes its line, so search latency
+        overlaps generation latency; results are merged in query order once all
+        searches are done, so the later query wins a shared URL as in
+        search_documents.
+        """
+        if planned := (state.get('query_plan') or {}).get(self.analyst_type):
+            queries = planned[:self.max_queries]
+            await self._announce_planned_queries(queries, state.get('websocket_manager'), state.get('job_id'))
+            return queries, await self.search_documents(state, queries)
+
+        prompt = prompt or self.query_prompt
+        if not self.stream_searches:
+            queries = await self.generate_queries(state, prompt)
+            documents = await self.search_documents(state, queries) if queries else {}
+            return queries, documents
+
+        websocket_manager = state.get('websocket_manager')
+        job_id = state.get('job_id')
+        dispatched: List[str] = []
+        search_tasks: List[asyncio.Task] = []
+        documents: Dict[str, Any] = {}
+
+        async def dispatch(query: str) -> None:
+            if len(dispatched) >= self.max_queries:
+                return
+            if not dispatched and websocket_manager and job_id:
+                await websocket_manager.send_status_update(
+                    job_id=job_id,
+                    status="search_started",
+                    message=f"Using Tavily to search queries for {self.analyst_type} as they are generated",
+                    result={
+                        "step": "Searching",
+                        "analyst": self.analyst_type
+                    }
+                )
+            dispatched.append(query)
+            search_tasks.append(asyncio.create_task(self._search_query(query, websocket_manager, job_id)))
+
+        try:
+            queries = await self.generate_queries(state, prompt, on_query=dispatch) or dispatched
+            if queries and websocket_manager and job_id:
+                await websocket_manager.send_status_update(
+                    job_id=job_id,
+                    status="queries_generated",
+                    message=f"Generated {len(queries)} queries for {self.analyst_type}",
+                    result={
+                        "step": "Searching",
+                        "analyst": self.analyst_type,
+                        "queries": queries,
+                        "total_queries": len(queries)
+                    }
+                )
+            for docs in await asyncio.gather(*search_tasks):
+                documents.update(docs)
+        except BaseException:
+            for task in search_tasks:
+                task.cancel()
+            raise
+
+        if search_tasks and websocket_manager and job_id:
+            await websocket_manager.send_status_update(
+                job_id=job_id,
+                status="search_complete",
+                message=f"Search completed with {len(documents)} documents found",
+                result={
+                    "step": "Searching",
+                    "total_documents": len(documents),
+                    "queries_processed": len(dispatched),
+                    "cache": self.search_cache.job_stats(job_id) if self.search_cache else None
+                }
+            )
+
+        return queries, documents
+
     def _format_query_prompt(self, prompt, company, hq, year):
         return f"""{prompt}
 
@@ -161,19 +288,93 @@ class BaseResearcher:
         - Provide exactly 4 search queries (one per line), with no hyphens or dashes
         - DO NOT make assumptions about the industry - use only the provided industry information"""
 
-    def _fallback_queries(self, company, year):
+    def _fallback_queries(self, company, year, industry=None, hq=None):
+        """Fill this analyst's query_templates, no LLM involved."""
+        values = {
+            "company": company,
+            "industry": industry or "",
+            "hq": hq or "",
+            "year": year
+        }
+        templates = [
+            template for template in self.query_templates
+            if industry or "{industry}" not in template
+        ]
         return [
-            f"{company} overview {year}",
-            f"{company} recent news {year}",
-            f"{company} financial reports {year}",
-            f"{company} industry analysis {year}"
+            " ".join(template.format(**values).split())
+            for template in templates[:self.max_queries]
         ]
 
+    def _search_params(self) -> Dict[str, Any]:
+        """Tavily search parameters for this analyst."""
+        search_params = {
+            "search_depth": "basic",
+            "include_raw_content": False,
+            "max_results": 5
+        }
+        if self.search_topic:
+            search_params["topic"] = self.search_topic
+        return search_params
+
+    def _process_results(self, query: str, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert raw Tavily results into documents attributed to their query."""
+        docs = {}
+        for result in results.get("results", []):
+            if not result.get("content") or not result.get("url"):
+                continue
+                
+            url = result.get("url")
+            title = result.get("title", "")
+            
+            # Clean up and validate the title using the references module
+            if title:
+                title = clean_title(title)
+                # If title is the same as URL or empty, set to empty to trigger extraction later
+                if title.lower() == url.lower() or not title.strip():
+                    title = ""
+            
+            logger.info(f"Tavily search result for '{query}': URL={url}, Title='{title}'")
+            
+            docs[url] = {
+                "title": title,
+                "content": result.get("content", ""),
+                "query": query,
+                "url": url,
+                "source": "web_search",
+                "score": result.get("score", 0.0)
+            }
+        return docs
+
+    async def _search(self, query: str, search_params: Dict[str, Any], job_id=None) -> Dict[str, Any]:
+        """Run a Tavily search, answering from the shared search cache when possible."""
+        if self.search_cache:
+            if (cached := await self.search_cache.get(query, search_params, job_id)) is not None:
+                return cached
+
+        async def search() -> Dict[str, Any]:
+            return await asyncio.wait_for(
+                self.tavily_client.search(query, **search_params), self.search_timeout
+            )
+
+        limiter = limiters.get("tavily_search")
+        if self.hedge_searches:
+            results = await hedged(limiter, search)
+        else:
+            async with limiter.slot():
+                results = await search()
+        if self.search_cache:
+            await self.search_cache.set(query, search_params, results)
+        return results
+
     async def search_single_query(self, query: str, websocket_manager=None, job_id=None) -> Dict[str, Any]:
         """Execute a single search query with proper error handling."""
         if not query or len(query.split()) < 3:
+            logger.info(f"Skipping search for short query: '{query}'")
             return {}
+        return await self._search_query(query, websocket_manager, job_id)
 
+    async def _search_query(self, query: str, websocket_manager=None, job_id=None) -> Dict[str, Any]:
+        """Search one query, reporting progress and returning {} on failure."""
         try:
             if websocket_manager and job_id:
                 await websocket_manager.send_status_update(
@@ -186,48 +387,8 @@ class BaseResearcher:
                     }
                 )
 
-            # Add news topic for news analysts
-            search_params = {
-                "search_depth": "basic",
-                "include_raw_content": False,
-                "max_results": 5
-            }
-            
-            if self.analyst_type == "news_analyst":
-                search_params["topic"] = "news"
-            elif self.analyst_type == "financial_analyst":
-                search_params["topic"] = "finance"
-
-            results = await self.tavily_client.search(
-                query,
-                **search_params
-            )
-            
-            docs = {}
-            for result in results.get("results", []):
-                if not result.get("content") or not result.get("url"):
-                    continue
-                    
-                url = result.get("url")
-                title = result.get("title", "")
-                
-                # Clean up and validate the title using the references module
-                if title:
-                    title = clean_title(title)
-                    # If title is the same as URL or empty, set to empty to trigger extraction later
-                    if title.lower() == url.lower() or not title.strip():
-                        title = ""
-                
-                logger.info(f"Tavily search result for '{query}': URL={url}, Title='{title}'")
-                
-                docs[url] = {
-                    "title": title,
-                    "content": result.get("content", ""),
-                    "query": query,
-                    "url": url,
-                    "source": "web_search",
-                    "score": result.get("score", 0.0)
-                }
+            results = await self._search(query, self._search_params(), job_id)
+            docs = self._process_results(query, results)
 
             if websocket_manager and job_id:
                 await websocket_manager.send_status_update(
@@ -260,7 +421,10 @@ class BaseResearcher:
 
     async def search_documents(self, state: ResearchState, queries: List[str]) -> Dict[str, Any]:
         """
-        Execute all Tavily searches in parallel at maximum speed
+        Execute all Tavily searches in parallel, one concurrent request per query.
+
+        Each document keeps the query that found it; when several queries return
+        the same URL the later query in the list wins, as with sequential search.
         """
         websocket_manager = state.get('websocket_manager')
         job_id = state.get('job_id')
@@ -283,19 +447,6 @@ class BaseResearcher:
                 }
             )
 
-        # Prepare all search parameters upfront
-        search_params = {
-            "search_depth": "basic",
-            "include_raw_content": False,
-            "max_results": 5
-        }
-        
-        if self.analyst_type == "news_analyst":
-            search_params["topic"] = "news"
-        elif self.analyst_type == "financial_analyst":
-            search_params["topic"] = "finance"
-
-        if websocket_manager and job_id:
             await websocket_manager.send_status_update(
                 job_id=job_id,
                 status="search_started",
@@ -305,42 +456,17 @@ class BaseResearcher:
                     "total_queries": len(queries)
                 }
             )
-        # Create all API calls upfront - direct Tavily client calls without the extra wrapper
-        search_tasks = [
-            self.tavily_client.search(query, **search_params)
-            for query in queries
-        ]
 
-        # Execute all API calls in parallel
-        try:
-            results = await asyncio.gather(*search_tasks)
-        except Exception as e:
-            logger.error(f"Error during parallel search execution: {e}")
-            return {}
+        # Execute all API calls in parallel; _search_query handles its own errors
+        results = await asyncio.gather(*[
+            self._search_query(query, websocket_manager, job_id)
+            for query in queries if query
+        ])
 
-        # Process results
+        # Merge results in query order
         merged_docs = {}
-        for query, result in zip(queries, results):
-            for item in result.get("results", []):
-                if not item.get("content") or not item.get("url"):
-                    continue
-                    
-                url = item.get("url")
-                title = item.get("title", "")
-                
-                if title:
-                    title = clean_title(title)
-                    if title.lower() == url.lower() or not title.strip():
-                        title = ""
-
-                merged_docs[url] = {
-                    "title": title,
-                    "content": item.get("content", ""),
-                    "query": query,
-                    "url": url,
-                    "source": "web_search",
-                    "score": item.get("score", 0.0)
-                }
+        for docs in results:
+            merged_docs.update(docs)
 
         # Send completion status
         if websocket_manager and job_id:
@@ -351,7 +477,8 @@ class BaseResearcher:
                 result={
                     "step": "Searching",
                     "total_documents": len(merged_docs),
-                    "queries_processed": len(queries)
+                    "queries_processed": len(queries),
+                    "cache": self.search_cache.job_stats(job_id) if self.search_cache else None
                 }
             )
 
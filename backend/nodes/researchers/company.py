@@ -7,6 +7,20 @@ from .base import BaseResearcher
 
 
 class CompanyAnalyzer(BaseResearcher):
+    query_prompt = """
+    Generate queries on the company fundamentals of {company} in the {industry} industry such as:
+    - Core products and services
+    - Company history and milestones
+    - Leadership team
+    - Business model and strategy
+    """
+    query_templates = [
+        "{company} products and services overview",
+        "{company} company history and milestones",
+        "{company} leadership team executives {hq}",
+        "{company} business model and strategy"
+    ]
+
     def __init__(self) -> None:
         super().__init__()
         self.analyst_type = "company_analyzer"
@@ -15,14 +29,8 @@ class CompanyAnalyzer(BaseResearcher):
         company = state.get('company', 'Unknown Company')
         msg = [f"🏢 Company Analyzer analyzing {company}"]
         
-        # Generate search queries using LLM
-        queries = await self.generate_queries(state, """
-        Generate queries on the company fundamentals of {company} in the {industry} industry such as:
-        - Core products and services
-        - Company history and milestones
-        - Leadership team
-        - Business model and strategy
-        """)
+        # Search the queries planned for this analyst, generating them if the plan has none
+        queries, documents = await self.research(state)
 
         # Add message to show subqueries with emojis
         subqueries_msg = "🔍 Subqueries for company analysis:\n" + "\n".join([f"• {query}" for query in queries])
@@ -58,13 +66,8 @@ class CompanyAnalyzer(BaseResearcher):
         
         # Perform additional research with comprehensive search
         try:
-            # Store documents with their respective queries
-            for query in queries:
-                documents = await self.search_documents(state, [query])
-                if documents:  # Only process if we got results
-                    for url, doc in documents.items():
-                        doc['query'] = query  # Associate each document with its query
-                        company_data[url] = doc
+            # Documents were searched per query and keep their query attribution
+            company_data.update(documents)
             
             msg.append(f"\n✓ Found {len(company_data)} documents")
             if websocket_manager := state.get('websocket_manager'):
@@ -9,6 +9,20 @@ from .base import BaseResearcher
 logger = logging.getLogger(__name__)
 
 class FinancialAnalyst(BaseResearcher):
+    query_prompt = """
+    Generate queries on the financial analysis of {company} in the {industry} industry such as:
+    - Fundraising history and valuation
+    - Financial statements and key metrics
+    - Revenue and profit sources
+    """
+    query_templates = [
+        "{company} funding rounds and valuation",
+        "{company} revenue and financial results {year}",
+        "{company} annual report key financial metrics",
+        "{company} investors and profitability {year}"
+    ]
+    search_topic = "finance"
+
     def __init__(self) -> None:
         super().__init__()
         self.analyst_type = "financial_analyzer"
@@ -19,15 +33,8 @@ class FinancialAnalyst(BaseResearcher):
         job_id = state.get('job_id')
         
         try:
-            # Generate search queries
-            queries = await self.generate_queries(
-                state,
-                """
-                 Generate queries on the financial analysis of {company} in the {industry} industry such as:
-        - Fundraising history and valuation
-        - Financial statements and key metrics
-        - Revenue and profit sources
-        """)
+            # Search the queries planned for this analyst, generating them if the plan has none
+            queries, documents = await self.research(state)
             
             # Add message to show subqueries with emojis
             subqueries_msg = "🔍 Subqueries for financial analysis:\n" + "\n".join([f"• {query}" for query in queries])
@@ -59,11 +66,8 @@ class FinancialAnalyst(BaseResearcher):
                     'query': f'Financial information on {company}'
                 }
 
-            for query in queries:
-                documents = await self.search_documents(state, [query])
-                for url, doc in documents.items():
-                    doc['query'] = query
-                    financial_data[url] = doc
+            # Documents were searched per query and keep their query attribution
+            financial_data.update(documents)
 
             # Final status update
             completion_msg = f"Completed analysis with {len(financial_data)} documents"
@@ -7,6 +7,25 @@ from .base import BaseResearcher
 
 
 class IndustryAnalyzer(BaseResearcher):
+    query_prompt = """
+    Generate queries on the industry analysis of {company} in the {industry} industry such as:
+    - Market position
+    - Competitors
+    - {industry} industry trends and challenges
+    - Market size and growth
+    """
+    query_templates = [
+        "{company} market position in {industry}",
+        "{company} competitors in {industry}",
+        "{industry} trends and challenges {year}",
+        "{industry} market size and growth {year}",
+        # Used instead when the industry is unknown
+        "{company} market position and competitors",
+        "{company} competitive landscape {year}",
+        "{company} market trends and challenges {year}",
+        "{company} market size and growth {year}"
+    ]
+
     def __init__(self) -> None:
         super().__init__()
         self.analyst_type = "industry_analyzer"
@@ -16,14 +35,8 @@ class IndustryAnalyzer(BaseResearcher):
         industry = state.get('industry', 'Unknown Industry')
         msg = [f"🏭 Industry Analyzer analyzing {company} in {industry}"]
         
-        # Generate search queries using LLM
-        queries = await self.generate_queries(state, """
-        Generate queries on the industry analysis of {company} in the {industry} industry such as:
-        - Market position
-        - Competitors
-        - {industry} industry trends and challenges
-        - Market size and growth
-        """)
+        # Search the queries planned for this analyst, generating them if the plan has none
+        queries, documents = await self.research(state)
 
         subqueries_msg = "🔍 Subqueries for industry analysis:\n" + "\n".join([f"• {query}" for query in queries])
         messages = state.get('messages', [])
@@ -58,13 +71,8 @@ class IndustryAnalyzer(BaseResearcher):
         
         # Perform additional research with increased search depth
         try:
-            # Store documents with their respective queries
-            for query in queries:
-                documents = await self.search_documents(state, [query])
-                if documents:  # Only process if we got results
-                    for url, doc in documents.items():
-                        doc['query'] = query  # Associate each document with its query
-                        industry_data[url] = doc
+            # Documents were searched per query and keep their query attribution
+            industry_data.update(documents)
             
             msg.append(f"\n✓ Found {len(industry_data)} documents")
             if websocket_manager := state.get('websocket_manager'):
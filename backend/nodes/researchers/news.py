@@ -7,6 +7,20 @@ from .base import BaseResearcher
 
 
 class NewsScanner(BaseResearcher):
+    query_prompt = """
+    Generate queries on the recent news coverage of {company} such as:
+    - Recent company announcements
+    - Press releases
+    - New partnerships
+    """
+    query_templates = [
+        "{company} news {year}",
+        "{company} press release announcement {year}",
+        "{company} new partnership {year}",
+        "{company} latest product launch"
+    ]
+    search_topic = "news"
+
     def __init__(self) -> None:
         super().__init__()
         self.analyst_type = "news_analyzer"
@@ -15,13 +29,8 @@ class NewsScanner(BaseResearcher):
         company = state.get('company', 'Unknown Company')
         msg = [f"📰 News Scanner analyzing {company}"]
         
-        # Generate search queries using LLM
-        queries = await self.generate_queries(state, """
-        Generate queries on the recent news coverage of {company} such as:
-        - Recent company announcements
-        - Press releases
-        - New partnerships
-        """)
+        # Search the queries planned for this analyst, generating them if the plan has none
+        queries, documents = await self.research(state)
 
         subqueries_msg = "🔍 Subqueries for news analysis:\n" + "\n".join([f"• {query}" for query in queries])
         messages = state.get('messages', [])
@@ -42,13 +51,8 @@ class NewsScanner(BaseResearcher):
         
         # Perform additional research with recent time filter
         try:
-            # Store documents with their respective queries
-            for query in queries:
-                documents = await self.search_documents(state, [query])
-                if documents:  # Only process if we got results
-                    for url, doc in documents.items():
-                        doc['query'] = query  # Associate each document with its query
-                        news_data[url] = doc
+            # Documents were searched per query and keep their query attribution
+            news_data.update(documents)
             
             msg.append(f"\n✓ Found {len(news_data)} documents")
             if websocket_manager := state.get('websocket_manager'):
@@ -0,0 +1,196 @@
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import google.generativeai as genai
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from tavily import AsyncTavilyClient
+
+logger = logging.getLogger(__name__)
+
+TAVILY_BASE_URL = "https://api.tavily.com"
+TAVILY_TIMEOUT = 180  # Matches the default of AsyncTavilyClient
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid integer for {name}, using default {default}")
+        return default
+
+
+def _pool_limits(upstream: str) -> httpx.Limits:
+    """Connection limits for an upstream, e.g. TAVILY_MAX_CONNECTIONS overrides UPSTREAM_MAX_CONNECTIONS."""
+    prefix = upstream.upper()
+    max_connections = _env_int(f"{prefix}_MAX_CONNECTIONS", _env_int("UPSTREAM_MAX_CONNECTIONS", 100))
+    max_keepalive = _env_int(f"{prefix}_MAX_KEEPALIVE", _env_int("UPSTREAM_MAX_KEEPALIVE", 20))
+    keepalive_expiry = _env_int("UPSTREAM_KEEPALIVE_EXPIRY", 30)
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=keepalive_expiry
+    )
+
+
+class _PoolStats:
+    """Request counters for one upstream connection pool."""
+
+    def __init__(self, limits: httpx.Limits):
+        self.limits = limits
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        max_connections = self.limits.max_connections or 0
+        return {
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "max_connections": max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "utilisation": round(self.in_flight / max_connections, 3) if max_connections else None
+        }
+
+
+class _MeteredTransport(httpx.AsyncBaseTransport):
+    """Pooled HTTP transport that counts requests waiting on or holding a connection."""
+
+    def __init__(self, limits: httpx.Limits, stats: _PoolStats):
+        self._transport = httpx.AsyncHTTPTransport(limits=limits)
+        self._stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self._stats
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            return await self._transport.handle_async_request(request)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class _SharedClientContext:
+    """Stands in for the per-call httpx client AsyncTavilyClient would create.
+
+    AsyncTavilyClient opens and closes a new httpx.AsyncClient around every
+    request; yielding a shared client instead keeps its connections alive.
+    """
+
+    def __init__(self, client: httpx.AsyncClient):
+        self._client = client
+
+    async def __aenter__(self) -> httpx.AsyncClient:
+        return self._client
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+
+class UpstreamClients:
+    """Process-wide registry of long-lived Tavily, OpenAI and Gemini clients."""
+
+    def __init__(self) -> None:
+        self._tavily: Optional[AsyncTavilyClient] = None
+        self._openai: Optional[AsyncOpenAI] = None
+        self._gemini_models: Dict[str, genai.GenerativeModel] = {}
+        self._gemini_configured = False
+        self._gemini_override: Any = None
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, _PoolStats] = {}
+
+    def _http_client(self, upstream: str, client_cls=httpx.AsyncClient, **kwargs) -> httpx.AsyncClient:
+        limits = _pool_limits(upstream)
+        stats = _PoolStats(limits)
+        client = client_cls(transport=_MeteredTransport(limits, stats), **kwargs)
+        self._http_clients[upstream] = client
+        self._stats[upstream] = stats
+        logger.info(
+            f"Created {upstream} connection pool "
+            f"(max_connections={limits.max_connections}, keepalive={limits.max_keepalive_connections})"
+        )
+        return client
+
+    def override(self, tavily: Any = None, openai: Any = None, gemini: Any = None) -> None:
+        """Serve the given objects instead of real clients, e.g. fakes for offline benchmarks.
+
+        Call before the workflow nodes are built; gemini stands in for every model name.
+        """
+        if tavily is not None:
+            self._tavily = tavily
+        if openai is not None:
+            self._openai = openai
+        if gemini is not None:
+            self._gemini_override = gemini
+
+    def tavily(self) -> AsyncTavilyClient:
+        if self._tavily is None:
+            tavily_key = os.getenv("TAVILY_API_KEY")
+            if not tavily_key:
+                raise ValueError("TAVILY_API_KEY environment variable is not set")
+            client = AsyncTavilyClient(api_key=tavily_key)
+            http_client = self._http_client(
+                "tavily",
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {tavily_key}"
+                },
+                base_url=TAVILY_BASE_URL,
+                timeout=TAVILY_TIMEOUT
+            )
+            client._client_creator = lambda: _SharedClientContext(http_client)
+            self._tavily = client
+        return self._tavily
+
+    def openai(self) -> AsyncOpenAI:
+        if self._openai is None:
+            openai_key = os.getenv("OPENAI_API_KEY")
+            if not openai_key:
+                raise ValueError("OPENAI_API_KEY environment variable is not set")
+            self._openai = AsyncOpenAI(
+                api_key=openai_key,
+                http_client=self._http_client("openai", client_cls=DefaultAsyncHttpxClient)
+            )
+        return self._openai
+
+    def gemini(self, model_name: str = "gemini-2.0-flash") -> genai.GenerativeModel:
+        if self._gemini_override is not None:
+            return self._gemini_override
+        if not self._gemini_configured:
+            gemini_key = os.getenv("GEMINI_API_KEY")
+            if not gemini_key:
+                raise ValueError("GEMINI_API_KEY environment variable is not set")
+            genai.configure(api_key=gemini_key)
+            self._gemini_configured = True
+        if model_name not in self._gemini_models:
+            self._gemini_models[model_name] = genai.GenerativeModel(model_name)
+        return self._gemini_models[model_name]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Current connection pool utilisation for each upstream."""
+        return {upstream: stats.snapshot() for upstream, stats in self._stats.items()}
+
+    async def aclose(self) -> None:
+        for upstream, client in self._http_clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing {upstream} client: {e}")
+        self._http_clients.clear()
+        self._stats.clear()
+        self._tavily = None
+        self._openai = None
+
+
+clients = UpstreamClients()
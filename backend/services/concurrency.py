@@ -0,0 +1,279 @@
+import asyncio
+import bisect
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Tuple, TypeVar
+
+import httpx
+import openai
+from google.api_core import exceptions as google_exceptions
+from tavily.errors import UsageLimitExceededError
+
+from .clients import _env_int
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Errors that mean the upstream is saturated rather than that the request was bad
+OVERLOAD_ERRORS = (
+    UsageLimitExceededError,
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.ServiceUnavailable,
+    httpx.TimeoutException,
+    asyncio.TimeoutError
+)
+
+# (initial, min, max) concurrent calls per upstream, process-wide
+DEFAULT_LIMITS: Dict[str, Tuple[int, int, int]] = {
+    "tavily_search": (16, 2, 64),
+    "tavily_extract": (4, 1, 16),
+    "openai": (16, 2, 64),
+    "gemini": (4, 1, 16)
+}
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram, ~10% resolution from 1 ms to about 10 minutes.
+
+    Counts are halved whenever max_samples is reached so the quantiles follow
+    the upstream's recent behaviour rather than its whole history.
+    """
+
+    def __init__(self, min_seconds: float = 0.001, growth: float = 1.1, buckets: int = 140,
+                 max_samples: int = 2000):
+        self.bounds = [min_seconds * growth ** i for i in range(buckets)]
+        self.counts = [0.0] * (buckets + 1)
+        self.count = 0.0
+        self.max_samples = max_samples
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        if self.count >= self.max_samples:
+            self.counts = [c / 2 for c in self.counts]
+            self.count /= 2
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile, or 0.0 with no samples."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0.0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.bounds[min(i, len(self.bounds) - 1)]
+        return self.bounds[-1]
+
+
+class AdaptiveLimiter:
+    """Concurrency limit for one upstream, adapted with AIMD.
+
+    Each call holds a slot for its whole duration; callers beyond the limit
+    wait in FIFO order. While demand fills the limit, every successful call
+    raises it by 1/limit (about +1 per round of calls). A 429 or timeout
+    multiplies it by backoff, once per round: overloads from calls that
+    started before the last decrease are counted but do not cut it again.
+    Latencies of successful calls, excluding time spent queued, feed a histogram.
+    """
+
+    def __init__(self, name: str, initial_limit: int, min_limit: int = 1, max_limit: int = 64,
+                 backoff: float = 0.5):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.limit = float(min(max(initial_limit, min_limit), self.max_limit))
+        self.backoff = backoff
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self.calls = 0
+        self.overloads = 0
+        self.decreases = 0
+        self.peak_queue_depth = 0
+        self._wait_seconds = 0.0
+        self.latency = LatencyHistogram()
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _has_capacity(self) -> bool:
+        return self._in_flight < int(self.limit)
+
+    def _wake(self) -> None:
+        while self._waiters and self._has_capacity():
+            future = self._waiters.popleft()
+            if not future.done():
+                self._in_flight += 1
+                future.set_result(None)
+
+    async def acquire(self) -> float:
+        """Wait for a slot and return the monotonic time it was granted."""
+        queued = time.monotonic()
+        if not self._waiters and self._has_capacity():
+            self._in_flight += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+            self.peak_queue_depth = max(self.peak_queue_depth, len(self._waiters))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Granted just as we were cancelled: hand the slot on
+                    self._in_flight -= 1
+                    self._wake()
+                elif future in self._waiters:
+                    self._waiters.remove(future)
+                raise
+        started = time.monotonic()
+        self.calls += 1
+        self._wait_seconds += started - queued
+        return started
+
+    def release(self, started: float, outcome: str = "ok") -> None:
+        """Free a slot; outcome is "ok", "overload", "error" or "cancelled" (the last two leave the limit alone)."""
+        saturated = self._in_flight + len(self._waiters) >= int(self.limit)
+        self._in_flight -= 1
+        if outcome != "cancelled":
+            metrics.observe("upstream", self.name, time.monotonic() - started, error=outcome != "ok")
+        if outcome == "overload":
+            self.overloads += 1
+            if started >= self._last_decrease:
+                previous = self.limit
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_decrease = time.monotonic()
+                self.decreases += 1
+                logger.warning(f"{self.name} overloaded, concurrency limit {previous:.1f} -> {self.limit:.1f}")
+        elif outcome == "ok":
+            self.latency.record(time.monotonic() - started)
+            if saturated:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        started = await self.acquire()
+        outcome = "ok"
+        try:
+            yield
+        except OVERLOAD_ERRORS:
+            outcome = "overload"
+            raise
+        except asyncio.CancelledError:
+            # E.g. the losing side of a hedged call
+            outcome = "cancelled"
+            raise
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            self.release(started, outcome)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "peak_queue_depth": self.peak_queue_depth,
+            "calls": self.calls,
+            "overloads": self.overloads,
+            "decreases": self.decreases,
+            "avg_wait_ms": round(1000 * self._wait_seconds / self.calls, 1) if self.calls else 0.0,
+            "p50_ms": round(1000 * self.latency.quantile(0.5), 1),
+            "p95_ms": round(1000 * self.latency.quantile(0.95), 1),
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins
+        }
+
+
+async def hedged(limiter: AdaptiveLimiter, make_call: Callable[[], Awaitable[T]], quantile: float = 0.95,
+                 min_samples: int = 20) -> T:
+    """Await make_call() in a limiter slot, hedging it if it outlives the upstream's quantile latency.
+
+    The hedge is a second attempt in its own slot, fired once the first has
+    held its slot for the quantile latency; the first attempt to succeed wins
+    and the other is cancelled. No hedge is sent before the limiter has
+    min_samples latencies or while other callers are queued for a slot.
+    """
+    acquired = asyncio.Event()
+
+    async def attempt() -> T:
+        async with limiter.slot():
+            acquired.set()
+            return await make_call()
+
+    attempts: List[asyncio.Task] = [asyncio.create_task(attempt())]
+    try:
+        if limiter.latency.count >= min_samples:
+            waiter = asyncio.create_task(acquired.wait())
+            await asyncio.wait([attempts[0], waiter], return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if not attempts[0].done():
+                done, _ = await asyncio.wait(attempts, timeout=limiter.latency.quantile(quantile))
+                if not done and not limiter.queue_depth:
+                    limiter.hedges += 1
+                    attempts.append(asyncio.create_task(attempt()))
+
+        error: BaseException = RuntimeError("No attempt completed")
+        pending = list(attempts)
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.remove(task)
+                if task.exception() is None:
+                    if task is not attempts[0]:
+                        limiter.hedge_wins += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in attempts:
+            task.cancel()
+
+
+class UpstreamLimiters:
+    """Process-wide adaptive limiters, one per upstream API.
+
+    Limits default to DEFAULT_LIMITS and can be overridden per upstream with
+    e.g. TAVILY_SEARCH_CONCURRENCY, TAVILY_SEARCH_CONCURRENCY_MIN and
+    TAVILY_SEARCH_CONCURRENCY_MAX.
+    """
+
+    def __init__(self) -> None:
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+
+    def get(self, upstream: str) -> AdaptiveLimiter:
+        if upstream not in self._limiters:
+            initial, min_limit, max_limit = DEFAULT_LIMITS.get(upstream, (8, 1, 32))
+            prefix = f"{upstream.upper()}_CONCURRENCY"
+            self._limiters[upstream] = AdaptiveLimiter(
+                upstream,
+                initial_limit=_env_int(prefix, initial),
+                min_limit=_env_int(f"{prefix}_MIN", min_limit),
+                max_limit=_env_int(f"{prefix}_MAX", max_limit)
+            )
+        return self._limiters[upstream]
+
+    def slot(self, upstream: str):
+        """Async context manager holding one concurrency slot for the upstream."""
+        return self.get(upstream).slot()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Current limit, in-flight calls and queue depth for each upstream."""
+        return {upstream: limiter.stats() for upstream, limiter in self._limiters.items()}
+
+
+limiters = UpstreamLimiters()
@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+# Query parameters that track the visitor rather than select the page
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "_ga", "_hsenc", "_hsmi", "ref_src"}
+
+
+def canonical_url(url: str) -> str:
+    """Normalise a URL for use as a store key.
+
+    Adds https:// when there is no scheme, lowercases scheme and host, and
+    drops the fragment, a trailing slash and tracking parameters (utm_* and
+    TRACKING_PARAMS). The rest of the query is kept, since it often selects
+    the page.
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    if "://" not in url:
+        url = "https://" + url
+    parsed = urlparse(url)
+    query = "&".join(
+        param for param in parsed.query.split("&")
+        if param and not (
+            (name := param.split("=", 1)[0].lower()).startswith("utm_") or name in TRACKING_PARAMS
+        )
+    )
+    return parsed._replace(
+        scheme=parsed.scheme.lower(),
+        netloc=parsed.netloc.lower(),
+        path=parsed.path.rstrip("/"),
+        query=query,
+        fragment=""
+    ).geturl()
+
+
+class ContentStore:
+    """Compressed, content-addressed store of extracted page content.
+
+    Pages are keyed by canonical URL; the zlib-compressed content is written
+    once per distinct SHA-256 digest under blobs/, so mirrors and repeated
+    extractions of the same text share a file. Entries older than
+    freshness_seconds are ignored, and the least recently used URLs are evicted
+    once the blobs exceed max_bytes.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 500 * 1024 * 1024,
+                 freshness_seconds: float = 72 * 3600):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.freshness_seconds = freshness_seconds
+        self.blob_dir = os.path.join(root, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(root, "index.sqlite3"), check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_digest ON pages (digest)")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], f"{digest}.zz")
+
+    def _get_many(self, urls: Iterable[str]) -> Dict[str, str]:
+        keys: Dict[str, List[str]] = {}
+        for url in urls:
+            keys.setdefault(canonical_url(url), []).append(url)
+        if not keys:
+            return {}
+        now = time.time()
+        found = {}
+        with self._lock:
+            placeholders = ",".join("?" * len(keys))
+            rows = self._conn.execute(
+                f"SELECT url, digest FROM pages WHERE url IN ({placeholders}) AND fetched_at >= ?",
+                (*keys, now - self.freshness_seconds)
+            ).fetchall()
+            for key, digest in rows:
+                try:
+                    with open(self._blob_path(digest), "rb") as f:
+                        content = zlib.decompress(f.read()).decode("utf-8")
+                except (OSError, zlib.error) as e:
+                    logger.warning(f"Dropping unreadable content for {key}: {e}")
+                    self._conn.execute("DELETE FROM pages WHERE url = ?", (key,))
+                    continue
+                self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, key))
+                for url in keys[key]:
+                    found[url] = content
+        self.hits += len(rows)
+        self.misses += len(keys) - len(rows)
+        return found
+
+    def _put_many(self, contents: Dict[str, str]) -> None:
+        now = time.time()
+        with self._lock:
+            for url, content in contents.items():
+                if not content:
+                    continue
+                data = content.encode("utf-8")
+                digest = hashlib.sha256(data).hexdigest()
+                if not self._conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone():
+                    path = self._blob_path(digest)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    compressed = zlib.compress(data, 6)
+                    with open(path, "wb") as f:
+                        f.write(compressed)
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO blobs (digest, size) VALUES (?, ?)", (digest, len(compressed))
+                    )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO pages (url, digest, fetched_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (canonical_url(url), digest, now, now)
+                )
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        while total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT url, digest FROM pages ORDER BY accessed_at LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            for url, digest in rows:
+                self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self.evictions += 1
+                if self._conn.execute("SELECT 1 FROM pages WHERE digest = ?", (digest,)).fetchone():
+                    continue
+                size = self._conn.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                self._conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                try:
+                    os.remove(self._blob_path(digest))
+                except OSError:
+                    pass
+                total -= size[0] if size else 0
+                if total <= self.max_bytes:
+                    break
+
+    async def get_many(self, urls: Iterable[str]) -> Dict[str, str]:
+        """Return fresh stored content for the given URLs, keyed by the URLs as passed in."""
+        try:
+            return await asyncio.to_thread(self._get_many, list(urls))
+        except Exception as e:
+            logger.warning(f"Content store lookup failed: {e}")
+            return {}
+
+    async def put_many(self, contents: Dict[str, str]) -> None:
+        try:
+            await asyncio.to_thread(self._put_many, contents)
+        except Exception as e:
+            logger.warning(f"Content store write failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pages = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            blobs, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        return {
+            "pages": pages,
+            "blobs": blobs,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+@lru_cache(maxsize=1)
+def get_content_store() -> Optional[ContentStore]:
+    """Process-wide extracted content store, or None when CONTENT_STORE=off."""
+    if os.getenv("CONTENT_STORE", "on").lower() in ("off", "false", "0"):
+        return None
+    root = os.getenv("CONTENT_STORE_DIR", "data/content")
+    try:
+        return ContentStore(
+            root,
+            max_bytes=int(os.getenv("CONTENT_STORE_MAX_MB", "500")) * 1024 * 1024,
+            freshness_seconds=float(os.getenv("CONTENT_STORE_FRESHNESS_HOURS", "72")) * 3600
+        )
+    except Exception as e:
+        logger.warning(f"Failed to open content store at {root}: {e}. Continuing without it.")
+        return None
@@ -0,0 +1,152 @@
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from .content_store import canonical_url
+
+logger = logging.getLogger(__name__)
+
+
+def url_domain(url: str) -> str:
+    domain = urlparse(canonical_url(url)).netloc
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+@dataclass
+class _DomainState:
+    consecutive_failures: int = 0
+    failures: int = 0
+    successes: int = 0
+    trips: int = 0
+    open_until: float = 0.0
+    probing: bool = False
+    last_error: str = ""
+
+
+class DomainCircuitBreaker:
+    """Per-domain circuit breaker and per-URL negative cache for content extraction.
+
+    A domain trips after failure_threshold consecutive extraction failures and
+    is skipped for cooldown_seconds, doubling on each repeated trip up to
+    max_cooldown_seconds. Once the cooldown ends one probe URL is let through:
+    success closes the circuit, failure re-opens it. Independently, a URL that
+    failed is skipped for negative_ttl_seconds.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown_seconds: float = 3600,
+                 max_cooldown_seconds: float = 24 * 3600, negative_ttl_seconds: float = 6 * 3600,
+                 probe_timeout_seconds: float = 120, max_urls: int = 10000, max_domains: int = 5000):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.probe_timeout_seconds = probe_timeout_seconds
+        self.max_urls = max_urls
+        self.max_domains = max_domains
+        self._domains: Dict[str, _DomainState] = {}
+        # Failed canonical URL -> time it may be retried, oldest first
+        self._failed_urls: "OrderedDict[str, float]" = OrderedDict()
+        self.skipped = 0
+
+    def _state(self, domain: str) -> _DomainState:
+        if domain not in self._domains and len(self._domains) >= self.max_domains:
+            # Forget healthy domains first; tripped ones are what the breaker is for
+            for name in [name for name, state in self._domains.items() if not state.trips]:
+                del self._domains[name]
+        return self._domains.setdefault(domain, _DomainState())
+
+    def check(self, url: str) -> Optional[str]:
+        """Return why url should not be extracted now, or None to go ahead."""
+        now = time.time()
+        key = canonical_url(url)
+        if (retry_at := self._failed_urls.get(key)) is not None:
+            if retry_at > now:
+                self.skipped += 1
+                return "URL failed extraction recently"
+            del self._failed_urls[key]
+
+        state = self._domains.get(url_domain(url))
+        if state and state.trips and state.consecutive_failures >= self.failure_threshold:
+            if state.open_until > now:
+                self.skipped += 1
+                return f"Extraction from {url_domain(url)} is failing ({state.last_error or 'unknown error'})"
+            # Half-open: let this URL probe the domain and hold the others back meanwhile
+            state.probing = True
+            state.open_until = now + self.probe_timeout_seconds
+        return None
+
+    def record_success(self, url: str) -> None:
+        state = self._state(url_domain(url))
+        if state.trips and state.consecutive_failures >= self.failure_threshold:
+            logger.info(f"Extraction circuit for {url_domain(url)} closed")
+        state.successes += 1
+        state.consecutive_failures = 0
+        state.trips = 0
+        state.open_until = 0.0
+        state.probing = False
+
+    def record_failure(self, url: str, error: str = "") -> None:
+        now = time.time()
+        domain = url_domain(url)
+        state = self._state(domain)
+        state.failures += 1
+        state.consecutive_failures += 1
+        state.last_error = error[:200]
+        # Trip on first reaching the threshold or on a failed probe, not on stragglers from the same batch
+        if state.consecutive_failures == self.failure_threshold or state.probing:
+            state.probing = False
+            cooldown = min(self.cooldown_seconds * 2 ** state.trips, self.max_cooldown_seconds)
+            state.trips += 1
+            state.open_until = now + cooldown
+            logger.warning(f"Extraction circuit for {domain} open for {cooldown:.0f}s: {state.last_error}")
+
+        key = canonical_url(url)
+        self._failed_urls[key] = now + self.negative_ttl_seconds
+        self._failed_urls.move_to_end(key)
+        while len(self._failed_urls) > self.max_urls:
+            self._failed_urls.popitem(last=False)
+
+    def tripped(self) -> List[Dict[str, Any]]:
+        """Domains whose circuit is open or awaiting a probe, longest-failing first."""
+        now = time.time()
+        domains = [
+            {
+                "domain": domain,
+                "state": "open" if state.open_until > now else "half_open",
+                "retry_in_seconds": max(0, round(state.open_until - now)),
+                "consecutive_failures": state.consecutive_failures,
+                "failures": state.failures,
+                "successes": state.successes,
+                "trips": state.trips,
+                "last_error": state.last_error
+            }
+            for domain, state in self._domains.items()
+            if state.trips and state.consecutive_failures >= self.failure_threshold
+        ]
+        return sorted(domains, key=lambda d: -d["consecutive_failures"])
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "tracked_domains": len(self._domains),
+            "negative_cached_urls": sum(1 for retry_at in self._failed_urls.values() if retry_at > now),
+            "skipped": self.skipped,
+            "tripped": self.tripped()
+        }
+
+
+@lru_cache(maxsize=1)
+def get_domain_breaker() -> Optional[DomainCircuitBreaker]:
+    """Process-wide extraction circuit breaker, or None when DOMAIN_BREAKER=off."""
+    if os.getenv("DOMAIN_BREAKER", "on").lower() in ("off", "false", "0"):
+        return None
+    return DomainCircuitBreaker(
+        failure_threshold=int(os.getenv("DOMAIN_BREAKER_FAILURES", "3")),
+        cooldown_seconds=float(os.getenv("DOMAIN_BREAKER_COOLDOWN_SECONDS", "3600")),
+        negative_ttl_seconds=float(os.getenv("EXTRACTION_NEGATIVE_TTL_SECONDS", str(6 * 3600)))
+    )
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Subscriber = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class EventBus:
+    """In-process job event bus.
+
+    publish() delivers a job's event to every subscriber in this process. It is
+    the default when a single worker serves all jobs.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: List[Subscriber] = []
+
+    def subscribe(self, callback: Subscriber) -> None:
+        self._subscribers.append(callback)
+
+    async def _deliver(self, job_id: str, message: Dict[str, Any]) -> None:
+        for callback in self._subscribers:
+            try:
+                await callback(job_id, message)
+            except Exception as e:
+                logger.error(f"Event subscriber failed for job {job_id}: {e}", exc_info=True)
+
+    async def publish(self, job_id: str, message: Dict[str, Any]) -> None:
+        await self._deliver(job_id, message)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class SQLiteEventBus(EventBus):
+    """Event bus shared by all worker processes through a local SQLite file.
+
+    Events are delivered to local subscribers immediately and appended to the
+    events table; every other process tails the table and delivers the events
+    it did not publish itself, so a WebSocket on any worker sees every job.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.05, retention_seconds: float = 3600):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.origin = uuid.uuid4().hex
+        if directory := os.path.dirname(path):
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                origin TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._last_id = 0
+        self._poller: Optional[asyncio.Task] = None
+
+    def _execute(self, sql: str, params=()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def publish(self, job_id: str, message: Dict[str, Any]) -> None:
+        await self._deliver(job_id, message)
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO events (job_id, origin, payload, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, self.origin, json.dumps(message, default=str), time.time())
+        )
+
+    async def start(self) -> None:
+        if self._poller:
+            return
+        rows = await asyncio.to_thread(self._execute, "SELECT COALESCE(MAX(id), 0) FROM events")
+        self._last_id = rows[0][0]
+        self._poller = asyncio.create_task(self._poll())
+        logger.info(f"SQLite event bus started at {self.path}")
+
+    async def _poll(self) -> None:
+        last_cleanup = time.monotonic()
+        while True:
+            try:
+                rows = await asyncio.to_thread(
+                    self._execute,
+                    "SELECT id, job_id, origin, payload FROM events WHERE id > ? ORDER BY id LIMIT 500",
+                    (self._last_id,)
+                )
+                for event_id, job_id, origin, payload in rows:
+                    self._last_id = event_id
+                    if origin != self.origin:
+                        await self._deliver(job_id, json.loads(payload))
+
+                if time.monotonic() - last_cleanup > 60:
+                    last_cleanup = time.monotonic()
+                    await asyncio.to_thread(
+                        self._execute,
+                        "DELETE FROM events WHERE created_at < ?",
+                        (time.time() - self.retention_seconds,)
+                    )
+                if len(rows) < 500:
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event bus poll failed: {e}")
+                await asyncio.sleep(1)
+
+    async def stop(self) -> None:
+        if self._poller:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+
+
+def create_event_bus() -> EventBus:
+    """Build the event bus selected by EVENT_BUS (local or sqlite)."""
+    backend = os.getenv("EVENT_BUS", "local").lower()
+    if backend == "sqlite":
+        path = os.getenv("EVENT_BUS_PATH", "data/events.sqlite3")
+        logger.info(f"Using SQLite event bus at {path}")
+        return SQLiteEventBus(path)
+    if backend != "local":
+        logger.warning(f"Unknown EVENT_BUS '{backend}', using in-process event bus")
+    return EventBus()
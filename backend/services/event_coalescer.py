@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Publisher = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+# High-frequency statuses: (how pending events merge, result fields that key them).
+# "latest" keeps the newest snapshot, "count" keeps the newest event and adds up
+# result["count"], "append" concatenates result["chunk"].
+COALESCED_STATUSES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "query_generating": ("latest", ("category", "query_number")),
+    "document_kept": ("count", ("doc_type",)),
+    "extracting": ("count", ("category",)),
+    "extracted": ("count", ("category",)),
+    "extraction_error": ("count", ("category",)),
+    "report_chunk": ("append", ())
+}
+
+# Statuses after which nothing more is sent for the job
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+def coalesce_key(message: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+    """Key under which a high-frequency status event merges, or None if it is never merged."""
+    if message.get("type") != "status_update":
+        return None
+    data = message.get("data") or {}
+    status = data.get("status")
+    if status not in COALESCED_STATUSES:
+        return None
+    result = data.get("result") or {}
+    return (status, *(result.get(field) for field in COALESCED_STATUSES[status][1]))
+
+
+def merge_events(previous: Dict[str, Any], message: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge message into the earlier event with the same coalesce_key."""
+    mode = COALESCED_STATUSES[message["data"]["status"]][0]
+    if mode == "latest":
+        return message
+    result = dict(message["data"].get("result") or {})
+    previous_result = previous["data"].get("result") or {}
+    if mode == "count":
+        result["count"] = previous_result.get("count", 1) + result.get("count", 1)
+    elif mode == "append":
+        result["chunk"] = previous_result.get("chunk", "") + result.get("chunk", "")
+    return {**message, "data": {**message["data"], "result": result}}
+
+
+class _JobBuffer:
+    def __init__(self) -> None:
+        self.pending: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        self.lock = asyncio.Lock()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class EventCoalescer:
+    """Merges a job's high-frequency status events into windowed snapshots.
+
+    Events listed in COALESCED_STATUSES are held for up to window seconds and
+    merged per key, so a burst of token or per-document updates reaches the
+    client as one message per key. Every other event is published
+    immediately, after first flushing the job's pending events so clients
+    still see events in order.
+    """
+
+    def __init__(self, publish: Publisher, window: float = 0.1):
+        self.publish = publish
+        self.window = window
+        self._jobs: Dict[str, _JobBuffer] = {}
+        self.received = 0
+        self.published = 0
+
+    async def _publish(self, job_id: str, message: Dict[str, Any]) -> None:
+        self.published += 1
+        await self.publish(job_id, message)
+
+    async def _flush_locked(self, job_id: str, buffer: _JobBuffer) -> None:
+        if buffer.timer:
+            buffer.timer.cancel()
+            buffer.timer = None
+        pending, buffer.pending = buffer.pending, {}
+        for message in pending.values():
+            await self._publish(job_id, message)
+
+    async def flush(self, job_id: str) -> None:
+        """Publish the job's pending events now."""
+        if buffer := self._jobs.get(job_id):
+            async with buffer.lock:
+                await self._flush_locked(job_id, buffer)
+
+    async def send(self, job_id: str, message: Dict[str, Any]) -> None:
+        self.received += 1
+        key = coalesce_key(message)
+        if self.window <= 0:
+            await self._publish(job_id, message)
+            return
+
+        buffer = self._jobs.setdefault(job_id, _JobBuffer())
+        if key is not None:
+            if previous := buffer.pending.get(key):
+                buffer.pending[key] = merge_events(previous, message)
+            else:
+                buffer.pending[key] = message
+            if buffer.timer is None:
+                buffer.timer = asyncio.get_running_loop().call_later(
+                    self.window, lambda: asyncio.ensure_future(self.flush(job_id))
+                )
+            return
+
+        async with buffer.lock:
+            await self._flush_locked(job_id, buffer)
+            await self._publish(job_id, message)
+        if (message.get("data") or {}).get("status") in TERMINAL_STATUSES:
+            self._jobs.pop(job_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": round(self.window * 1000),
+            "received": self.received,
+            "published": self.published,
+            "pending_jobs": sum(1 for buffer in self._jobs.values() if buffer.pending)
+        }
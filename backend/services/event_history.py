@@ -0,0 +1,62 @@
+import os
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+class EventHistory:
+    """Bounded per-job ring buffers of recent events, keyed by event_id.
+
+    Each job keeps its last max_events events so a client that connects late,
+    or reconnects with the last event_id it saw, can be replayed what it
+    missed. Only the max_jobs most recently active jobs are kept.
+    """
+
+    def __init__(self, max_events: int = 1000, max_jobs: int = 200):
+        self.max_events = max_events
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Deque[Tuple[int, Any]]]" = OrderedDict()
+        self._sequences: Dict[str, int] = {}
+
+    def next_id(self, job_id: str) -> int:
+        """Allocate the job's next event_id."""
+        event_id = self._sequences.get(job_id, 0) + 1
+        self._sequences[job_id] = event_id
+        return event_id
+
+    def append(self, job_id: str, event_id: int, event: Any) -> None:
+        events = self._jobs.get(job_id)
+        if events is None:
+            events = self._jobs[job_id] = deque(maxlen=self.max_events)
+            while len(self._jobs) > self.max_jobs:
+                evicted, _ = self._jobs.popitem(last=False)
+                self._sequences.pop(evicted, None)
+        else:
+            self._jobs.move_to_end(job_id)
+        # Events from another worker keep that worker's numbering
+        self._sequences[job_id] = max(self._sequences.get(job_id, 0), event_id)
+        events.append((event_id, event))
+
+    def since(self, job_id: str, last_event_id: Optional[int] = None) -> List[Any]:
+        """Events after last_event_id, oldest first; all retained events if it is None."""
+        events = self._jobs.get(job_id)
+        if not events:
+            return []
+        after = last_event_id if last_event_id is not None else 0
+        return [event for event_id, event in events if event_id > after]
+
+    def __contains__(self, job_id: str) -> bool:
+        return bool(self._jobs.get(job_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "jobs": len(self._jobs),
+            "events": sum(len(events) for events in self._jobs.values()),
+            "max_events_per_job": self.max_events
+        }
+
+
+def create_event_history() -> EventHistory:
+    return EventHistory(
+        max_events=int(os.getenv("EVENT_HISTORY_SIZE", "1000")),
+        max_jobs=int(os.getenv("EVENT_HISTORY_JOBS", "200"))
+    )
@@ -0,0 +1,147 @@
+import asyncio
+import bisect
+import itertools
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the admission queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass(order=True)
+class _QueuedJob:
+    sort_key: Tuple[int, int]
+    job_id: str = field(compare=False)
+    args: Tuple[Any, ...] = field(compare=False)
+
+
+class JobScheduler:
+    """Bounded admission queue feeding a fixed pool of research workers.
+
+    Jobs run in priority order (higher first), FIFO within a priority. At most
+    max_concurrent_jobs handlers run at once and at most max_queue_size jobs
+    wait; further submissions raise QueueFullError with a Retry-After estimate.
+    Queued jobs are told their position over the WebSocket whenever it changes.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[..., Awaitable[None]],
+        max_concurrent_jobs: int = 4,
+        max_queue_size: int = 20,
+        websocket_manager=None,
+        initial_job_seconds: float = 60.0
+    ):
+        self.handler = handler
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.max_queue_size = max_queue_size
+        self.websocket_manager = websocket_manager
+        self._pending: List[_QueuedJob] = []
+        self._available = asyncio.Semaphore(0)
+        self._sequence = itertools.count()
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, float] = {}
+        self._avg_job_seconds = initial_job_seconds
+        self._completed = 0
+        self._rejected = 0
+
+    def _ensure_workers(self) -> None:
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(i))
+            for i in range(self.max_concurrent_jobs)
+        ]
+        logger.info(f"Started {self.max_concurrent_jobs} research workers (queue size {self.max_queue_size})")
+
+    def retry_after(self) -> int:
+        """Estimated seconds until a queue slot frees up."""
+        waves = math.ceil((len(self._pending) + 1) / self.max_concurrent_jobs)
+        return max(1, int(waves * self._avg_job_seconds))
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based position of a queued job, or None if it is not waiting."""
+        for i, job in enumerate(self._pending):
+            if job.job_id == job_id:
+                return i + 1
+        return None
+
+    async def submit(self, job_id: str, *args: Any, priority: int = 0) -> int:
+        """Queue a job and return its position; 0 means a worker picks it up immediately."""
+        if len(self._pending) >= self.max_queue_size:
+            self._rejected += 1
+            raise QueueFullError(self.retry_after())
+
+        self._ensure_workers()
+        job = _QueuedJob((-priority, next(self._sequence)), job_id, args)
+        bisect.insort(self._pending, job)
+        self._available.release()
+
+        # Jobs ahead of this one that idle workers have not popped yet do not wait
+        idle_workers = self.max_concurrent_jobs - len(self._running)
+        position = self.position(job_id) - idle_workers
+        if position <= 0:
+            return 0
+        await self._broadcast_positions(start=idle_workers + position - 1, offset=idle_workers)
+        return position
+
+    async def _broadcast_positions(self, start: int = 0, offset: int = 0) -> None:
+        if not self.websocket_manager:
+            return
+        queue_length = len(self._pending) - offset
+        for i, job in enumerate(list(self._pending[start:]), start=start - offset + 1):
+            await self.websocket_manager.send_status_update(
+                job_id=job.job_id,
+                status="queued",
+                message=f"Waiting for a research worker (position {i} of {queue_length})",
+                result={
+                    "position": i,
+                    "queue_length": queue_length
+                }
+            )
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            await self._available.acquire()
+            job = self._pending.pop(0)
+            started = time.monotonic()
+            self._running[job.job_id] = started
+            if self._pending:
+                await self._broadcast_positions()
+
+            try:
+                await self.handler(job.job_id, *job.args)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed job {job.job_id}: {e}", exc_info=True)
+            finally:
+                del self._running[job.job_id]
+                duration = time.monotonic() - started
+                self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * duration
+                self._completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent_jobs": self.max_concurrent_jobs,
+            "max_queue_size": self.max_queue_size,
+            "running": len(self._running),
+            "queued": len(self._pending),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_job_seconds": round(self._avg_job_seconds, 1)
+        }
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
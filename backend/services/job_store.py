@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _new_job() -> Dict[str, Any]:
+    return {
+        "status": "pending",
+        "result": None,
+        "error": None,
+        "debug_info": [],
+        "company": None,
+        "report": None,
+        "last_update": datetime.now().isoformat()
+    }
+
+
+class JobStore(ABC):
+    """Bounded store of job status records.
+
+    Records expire ttl_seconds after their last update and the least recently
+    used records are evicted once more than max_jobs are held. Looking up an
+    unknown job returns None rather than creating a record.
+    """
+
+    def __init__(self, max_jobs: int = 1000, ttl_seconds: float = 24 * 3600):
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self.expirations = 0
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the job record, or None if unknown or expired."""
+
+    @abstractmethod
+    def update(self, job_id: str, **fields: Any) -> Dict[str, Any]:
+        """Merge fields into the job record, creating it if needed, and return it."""
+
+    @abstractmethod
+    def delete(self, job_id: str) -> None:
+        """Remove a job record if present."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def __contains__(self, job_id: str) -> bool:
+        return self.get(job_id) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "jobs": len(self),
+            "max_jobs": self.max_jobs,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+class MemoryJobStore(JobStore):
+    """In-process LRU/TTL job store."""
+
+    def __init__(self, max_jobs: int = 1000, ttl_seconds: float = 24 * 3600):
+        super().__init__(max_jobs, ttl_seconds)
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Last update time per job, oldest first
+        self._updated: "OrderedDict[str, float]" = OrderedDict()
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._updated:
+            job_id, updated = next(iter(self._updated.items()))
+            if updated >= cutoff:
+                break
+            self.delete(job_id)
+            self.expirations += 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._expire()
+        if job_id not in self._jobs:
+            return None
+        self._jobs.move_to_end(job_id)
+        return dict(self._jobs[job_id])
+
+    def update(self, job_id: str, **fields: Any) -> Dict[str, Any]:
+        self._expire()
+        job = self._jobs.get(job_id) or _new_job()
+        job.update(fields)
+        job["last_update"] = datetime.now().isoformat()
+        self._jobs[job_id] = job
+        self._jobs.move_to_end(job_id)
+        self._updated[job_id] = time.monotonic()
+        self._updated.move_to_end(job_id)
+
+        while len(self._jobs) > self.max_jobs:
+            oldest, _ = self._jobs.popitem(last=False)
+            self._updated.pop(oldest, None)
+            self.evictions += 1
+        return dict(job)
+
+    def delete(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+        self._updated.pop(job_id, None)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+
+class SQLiteJobStore(JobStore):
+    """Job store persisted to a local SQLite file, surviving worker restarts."""
+
+    def __init__(self, path: str, max_jobs: int = 1000, ttl_seconds: float = 24 * 3600):
+        super().__init__(max_jobs, ttl_seconds)
+        self.path = path
+        if directory := os.path.dirname(path):
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_accessed_at ON jobs (accessed_at)")
+
+    def _expire(self) -> None:
+        cursor = self._conn.execute(
+            "DELETE FROM jobs WHERE updated_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        self.expirations += max(cursor.rowcount, 0)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM jobs WHERE job_id = ? AND updated_at >= ?",
+                (job_id, time.time() - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE jobs SET accessed_at = ? WHERE job_id = ?", (time.time(), job_id))
+            return json.loads(row[0])
+
+    def update(self, job_id: str, **fields: Any) -> Dict[str, Any]:
+        with self._lock:
+            self._expire()
+            row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            job = json.loads(row[0]) if row else _new_job()
+            job.update(fields)
+            job["last_update"] = datetime.now().isoformat()
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, data, updated_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (job_id, json.dumps(job, default=str), now, now)
+            )
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE job_id IN ("
+                "SELECT job_id FROM jobs ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_jobs,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+            return job
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+
+def create_job_store() -> JobStore:
+    """Build the job store selected by JOB_STORE (memory or sqlite)."""
+    max_jobs = int(os.getenv("JOB_STORE_MAX_JOBS", "1000"))
+    ttl_seconds = float(os.getenv("JOB_STORE_TTL_SECONDS", str(24 * 3600)))
+    backend = os.getenv("JOB_STORE", "memory").lower()
+
+    if backend == "sqlite":
+        path = os.getenv("JOB_STORE_PATH", "data/jobs.sqlite3")
+        logger.info(f"Using SQLite job store at {path}")
+        return SQLiteJobStore(path, max_jobs=max_jobs, ttl_seconds=ttl_seconds)
+    if backend != "memory":
+        logger.warning(f"Unknown JOB_STORE '{backend}', using in-memory job store")
+    return MemoryJobStore(max_jobs=max_jobs, ttl_seconds=ttl_seconds)
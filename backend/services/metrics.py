@@ -0,0 +1,133 @@
+import bisect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Job whose work the current task is doing; tasks started by the job inherit it
+current_job: ContextVar[Optional[str]] = ContextVar("current_job", default=None)
+
+# Histogram bucket upper bounds in seconds, Prometheus style
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class _Series:
+    __slots__ = ("count", "errors", "seconds", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, seconds: float, error: bool) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if error:
+            self.errors += 1
+        index = bisect.bisect_left(BUCKETS, seconds)
+        if index < len(BUCKETS):
+            self.buckets[index] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 3)
+        }
+
+
+class Metrics:
+    """Timings of graph nodes, upstream API calls and WebSocket sends.
+
+    Every observation is added to a process-wide histogram per (kind, name),
+    exported by render_prometheus(), and to the running job's own totals
+    between start_job() and finish_job(). Upstream calls find their job
+    through the current_job context variable.
+    """
+
+    # kind -> (metric name, label name, help text)
+    KINDS = {
+        "node": ("research_node_duration_seconds", "node", "Wall time of graph node runs"),
+        "upstream": ("research_upstream_call_duration_seconds", "upstream", "Latency of upstream API calls"),
+        "send": ("research_websocket_send_duration_seconds", "transport", "Time spent sending messages to clients")
+    }
+
+    def __init__(self) -> None:
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._jobs: Dict[str, Dict[Tuple[str, str], _Series]] = {}
+        self.jobs_started = 0
+        self.jobs_finished: Dict[str, int] = {}
+
+    def start_job(self, job_id: str) -> None:
+        self._jobs[job_id] = {}
+        self.jobs_started += 1
+
+    def finish_job(self, job_id: str, status: str) -> Dict[str, Any]:
+        """Stop collecting for the job and return its totals by kind and name."""
+        series = self._jobs.pop(job_id, None)
+        if series is None:
+            series = {}
+        else:
+            self.jobs_finished[status] = self.jobs_finished.get(status, 0) + 1
+        summary: Dict[str, Dict[str, Any]] = {kind: {} for kind in self.KINDS}
+        for (kind, name), values in sorted(series.items()):
+            summary[kind][name] = values.summary()
+        return summary
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False,
+                job_id: Optional[str] = None) -> None:
+        key = (kind, name)
+        if key not in self._series:
+            self._series[key] = _Series()
+        self._series[key].observe(seconds, error)
+        job = self._jobs.get(job_id or current_job.get())
+        if job is not None:
+            if key not in job:
+                job[key] = _Series()
+            job[key].observe(seconds, error)
+
+    @contextmanager
+    def timer(self, kind: str, name: str, job_id: Optional[str] = None) -> Iterator[None]:
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(kind, name, time.perf_counter() - started, error, job_id)
+
+    def render_prometheus(self) -> str:
+        """All aggregate series in the Prometheus text exposition format."""
+        lines: List[str] = [
+            "# HELP research_jobs_started_total Research jobs started",
+            "# TYPE research_jobs_started_total counter",
+            f"research_jobs_started_total {self.jobs_started}",
+            "# HELP research_jobs_finished_total Research jobs finished, by final status",
+            "# TYPE research_jobs_finished_total counter",
+            *(f'research_jobs_finished_total{{status="{status}"}} {count}'
+              for status, count in sorted(self.jobs_finished.items())),
+            "# HELP research_jobs_running Research jobs in progress",
+            "# TYPE research_jobs_running gauge",
+            f"research_jobs_running {len(self._jobs)}"
+        ]
+        for kind, (metric, label, help_text) in self.KINDS.items():
+            series = sorted((name, values) for (k, name), values in self._series.items() if k == kind)
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for name, values in series:
+                cumulative = 0
+                for bound, count in zip(BUCKETS, values.buckets):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{{label}="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{{label}="{name}",le="+Inf"}} {values.count}')
+                lines.append(f'{metric}_sum{{{label}="{name}"}} {values.seconds:.6f}')
+                lines.append(f'{metric}_count{{{label}="{name}"}} {values.count}')
+            errors = f"{metric.replace('_duration_seconds', '')}_errors_total"
+            lines += [f"# HELP {errors} Failed observations counted in {metric}", f"# TYPE {errors} counter"]
+            lines += [f'{errors}{{{label}="{name}"}} {values.errors}' for name, values in series]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
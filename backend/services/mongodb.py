@@ -1,8 +1,19 @@
+import asyncio
+import copy
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from typing import Any, Dict, Optional
 
 import certifi
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Exclude Mongo's ObjectId from results so documents serialise as plain JSON
+PROJECTION = {"_id": 0}
 
 
 class MongoDBService:
@@ -18,6 +29,11 @@ class MongoDBService:
         self.jobs = self.db.jobs
         self.reports = self.db.reports
 
+    def ensure_indexes(self) -> None:
+        """Create the unique job_id indexes used by every lookup."""
+        self.jobs.create_index("job_id", unique=True)
+        self.reports.create_index("job_id", unique=True)
+
     def create_job(self, job_id: str, inputs: Dict[str, Any]) -> None:
         """Create a new research job record."""
         self.jobs.insert_one({
@@ -46,21 +62,203 @@ class MongoDBService:
             {"$set": update_data}
         )
 
+    def bulk_update_jobs(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        """Apply field updates to many jobs in a single round trip."""
+        if not updates:
+            return
+        now = datetime.utcnow()
+        self.jobs.bulk_write([
+            UpdateOne({"job_id": job_id}, {"$set": {**fields, "updated_at": now}})
+            for job_id, fields in updates.items()
+        ], ordered=False)
+
     def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a job by ID."""
-        return self.jobs.find_one({"job_id": job_id})
+        return self.jobs.find_one({"job_id": job_id}, PROJECTION)
 
     def store_report(self, job_id: str, report_data: Dict[str, Any]) -> None:
         """Store the finalized research report."""
-        self.reports.insert_one({
+        self.reports.update_one(
+            {"job_id": job_id},
+            {"$set": {
+                "job_id": job_id,
+                "report_content": report_data.get("report", ""),
+                "references": report_data.get("references", []),
+                "sections": report_data.get("sections_completed", []),
+                "analyst_queries": report_data.get("analyst_queries", {}),
+                "created_at": datetime.utcnow()
+            }},
+            upsert=True
+        )
+
+    def get_report(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a report by job ID."""
+        return self.reports.find_one({"job_id": job_id}, PROJECTION)
+
+
+class InMemoryMongoDBService:
+    """Dict-backed stand-in for MongoDBService, for tests and benchmarks.
+
+    latency simulates a blocking database round trip on every call.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.reports: Dict[str, Dict[str, Any]] = {}
+
+    def _round_trip(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def ensure_indexes(self) -> None:
+        self._round_trip()
+
+    def bulk_update_jobs(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        self._round_trip()
+        now = datetime.utcnow()
+        for job_id, fields in updates.items():
+            if job_id in self.jobs:
+                self.jobs[job_id].update({**fields, "updated_at": now})
+
+    def create_job(self, job_id: str, inputs: Dict[str, Any]) -> None:
+        self._round_trip()
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "inputs": inputs,
+            "status": "pending",
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+
+    def update_job(self, job_id: str,
+                   status: str = None,
+                   result: Dict[str, Any] = None,
+                   error: str = None) -> None:
+        self._round_trip()
+        if job_id not in self.jobs:
+            return
+        update_data = {"updated_at": datetime.utcnow()}
+        if status:
+            update_data["status"] = status
+        if result:
+            update_data["result"] = result
+        if error:
+            update_data["error"] = error
+        self.jobs[job_id].update(update_data)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._round_trip()
+        return copy.deepcopy(self.jobs.get(job_id))
+
+    def store_report(self, job_id: str, report_data: Dict[str, Any]) -> None:
+        self._round_trip()
+        self.reports[job_id] = {
             "job_id": job_id,
             "report_content": report_data.get("report", ""),
             "references": report_data.get("references", []),
             "sections": report_data.get("sections_completed", []),
             "analyst_queries": report_data.get("analyst_queries", {}),
             "created_at": datetime.utcnow()
-        })
+        }
 
     def get_report(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve a report by job ID."""
-        return self.reports.find_one({"job_id": job_id}) 
\ No newline at end of file
+        self._round_trip()
+        return copy.deepcopy(self.reports.get(job_id))
+
+
+class AsyncMongoDBService:
+    """Non-blocking wrapper with the same interface as MongoDBService.
+
+    pymongo is synchronous, so every call runs on a dedicated thread pool and
+    a slow database round trip never stalls the event loop.
+
+    Progress updates queued with queue_progress() are written behind: updates
+    for the same job are coalesced and flushed every flush_interval seconds
+    (or once max_batch jobs are pending) in a single bulk_write.
+    """
+
+    def __init__(self, service, max_workers: int = 4, flush_interval: float = 1.0, max_batch: int = 100):
+        self.service = service
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mongodb")
+        self._pending_progress: Dict[str, Dict[str, Any]] = {}
+        self._flush_requested = asyncio.Event()
+        # Held around each progress flush and final status write so the two cannot reorder
+        self._write_lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self.progress_updates_queued = 0
+        self.progress_writes = 0
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def ensure_indexes(self) -> None:
+        await self._run(self.service.ensure_indexes)
+
+    async def create_job(self, job_id: str, inputs: Dict[str, Any]) -> None:
+        await self._run(self.service.create_job, job_id, inputs)
+
+    async def update_job(self, job_id: str,
+                         status: str = None,
+                         result: Dict[str, Any] = None,
+                         error: str = None) -> None:
+        # Wait out any flush already in flight and write the job's buffered progress
+        # first, so no progress write can land after the final status
+        async with self._write_lock:
+            if progress := self._pending_progress.pop(job_id, None):
+                await self._write_progress({job_id: progress})
+            await self._run(self.service.update_job, job_id, status=status, result=result, error=error)
+
+    def queue_progress(self, job_id: str, **fields: Any) -> None:
+        """Buffer a progress update; later fields for the same job overwrite earlier ones."""
+        self._pending_progress.setdefault(job_id, {}).update(fields)
+        self.progress_updates_queued += 1
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+        if len(self._pending_progress) >= self.max_batch:
+            self._flush_requested.set()
+
+    async def _write_progress(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        try:
+            await self._run(self.service.bulk_update_jobs, updates)
+            self.progress_writes += 1
+        except Exception as e:
+            logger.warning(f"Failed to write progress for {len(updates)} jobs: {e}")
+
+    async def flush(self) -> None:
+        """Write all buffered progress updates in one batch."""
+        if not self._pending_progress:
+            return
+        async with self._write_lock:
+            updates, self._pending_progress = self._pending_progress, {}
+            if updates:
+                await self._write_progress(updates)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.service.get_job, job_id)
+
+    async def store_report(self, job_id: str, report_data: Dict[str, Any]) -> None:
+        await self._run(self.service.store_report, job_id, report_data)
+
+    async def get_report(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.service.get_report, job_id)
+
+    async def close(self) -> None:
+        if self._flusher:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached result stays fresh, by Tavily search topic
+DEFAULT_TTLS = {
+    "news": 3600,
+    "finance": 6 * 3600,
+    "general": 7 * 24 * 3600
+}
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, trim punctuation and collapse whitespace so trivial variants share an entry."""
+    query = re.sub(r"\s+", " ", query.lower())
+    return query.strip(" \t\n\"'.,;:!?")
+
+
+class SearchCache:
+    """Size-bounded LRU cache of Tavily search responses on local SQLite.
+
+    Entries are keyed by the normalised query plus the search parameters and
+    expire after a topic-specific TTL. The least recently used entries beyond
+    max_entries are trimmed every 100 writes. Hit/miss counters are kept per job.
+    """
+
+    def __init__(self, path: str, max_entries: int = 20000, ttls: Optional[Dict[str, int]] = None,
+                 max_tracked_jobs: int = 1000):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_tracked_jobs = max_tracked_jobs
+        if directory := os.path.dirname(path):
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                topic TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS search_cache_accessed_at ON search_cache (accessed_at)")
+        self._job_stats: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+
+    @staticmethod
+    def make_key(query: str, params: Dict[str, Any]) -> str:
+        material = json.dumps({"query": normalize_query(query), **params}, sort_keys=True)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def _ttl(self, params: Dict[str, Any]) -> int:
+        return self.ttls.get(params.get("topic", "general"), self.ttls["general"])
+
+    def _record(self, job_id: Optional[str], hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if not job_id:
+            return
+        stats = self._job_stats.setdefault(job_id, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+        self._job_stats.move_to_end(job_id)
+        while len(self._job_stats) > self.max_tracked_jobs:
+            self._job_stats.popitem(last=False)
+
+    def _get(self, key: str, ttl: int) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM search_cache WHERE key = ? AND created_at >= ?",
+                (key, now - ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE search_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def _set(self, key: str, topic: str, results: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, topic, payload, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, topic, json.dumps(results), now, now)
+            )
+            # Trim in batches rather than scanning the index on every write
+            self._writes += 1
+            if self._writes % 100:
+                return
+            cursor = self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN ("
+                "SELECT key FROM search_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+    async def get(self, query: str, params: Dict[str, Any], job_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached response or None, counting the hit or miss against job_id."""
+        try:
+            results = await asyncio.to_thread(self._get, self.make_key(query, params), self._ttl(params))
+        except Exception as e:
+            logger.warning(f"Search cache read failed: {e}")
+            results = None
+        self._record(job_id, results is not None)
+        return results
+
+    async def set(self, query: str, params: Dict[str, Any], results: Dict[str, Any]) -> None:
+        try:
+            await asyncio.to_thread(
+                self._set, self.make_key(query, params), params.get("topic", "general"), results
+            )
+        except Exception as e:
+            logger.warning(f"Search cache write failed: {e}")
+
+    def job_stats(self, job_id: str) -> Dict[str, int]:
+        return dict(self._job_stats.get(job_id, {"hits": 0, "misses": 0}))
+
+    def pop_job_stats(self, job_id: str) -> Dict[str, int]:
+        return self._job_stats.pop(job_id, {"hits": 0, "misses": 0})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "ttls": self.ttls
+        }
+
+
+@lru_cache(maxsize=1)
+def get_search_cache() -> Optional[SearchCache]:
+    """Process-wide search cache, or None when SEARCH_CACHE=off."""
+    if os.getenv("SEARCH_CACHE", "on").lower() in ("off", "false", "0"):
+        return None
+    ttls = {
+        topic: int(os.getenv(f"SEARCH_CACHE_TTL_{topic.upper()}", ttl))
+        for topic, ttl in DEFAULT_TTLS.items()
+    }
+    path = os.getenv("SEARCH_CACHE_PATH", "data/search_cache.sqlite3")
+    try:
+        return SearchCache(path, max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "20000")), ttls=ttls)
+    except Exception as e:
+        logger.warning(f"Failed to open search cache at {path}: {e}. Continuing without it.")
+        return None
@@ -1,75 +1,305 @@
+import asyncio
 import json
 import logging
+import os
+from collections import deque
 from datetime import datetime
-from typing import Dict, Set
+from typing import Any, AsyncIterator, Deque, Dict, Optional
 
 from fastapi import WebSocket
 
+from .event_bus import EventBus
+from .event_coalescer import COALESCED_STATUSES, TERMINAL_STATUSES, EventCoalescer, coalesce_key, merge_events
+from .event_history import create_event_history
+from .metrics import metrics
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
+
+def status_update(status: str, message: str = None, error: str = None, result: dict = None) -> dict:
+    return {
+        "type": "status_update",
+        "data": {
+            "status": status,
+            "message": message,
+            "error": error,
+            "result": result
+        }
+    }
+
+
+class _Frame:
+    __slots__ = ("text", "message", "key")
+
+    def __init__(self, message: dict):
+        self.message = message
+        self.text = json.dumps(message)
+        self.key = coalesce_key(message)
+
+    @property
+    def droppable(self) -> bool:
+        """Progress frames that a later frame supersedes, so losing one loses no information."""
+        if self.message.get("type") == "state_update":
+            return True
+        return self.key is not None and COALESCED_STATUSES[self.key[0]][0] == "latest"
+
+    def sse(self) -> str:
+        """The frame as a server-sent event, with its event_id as the SSE id."""
+        event_id = self.message.get("event_id")
+        return f"id: {event_id}\ndata: {self.text}\n\n" if event_id is not None else f"data: {self.text}\n\n"
+
+
+class _Connection:
+    """A client with a bounded outbound queue, drained by its own writer task for
+    a WebSocket or by the response generator for a server-sent event stream.
+
+    When the queue is full a new progress frame absorbs the queued frame with
+    the same coalesce key and takes its place at the tail, or else the oldest
+    droppable frame is dropped. Either way event ids leave the queue in
+    increasing order. Frames that cannot be merged or dropped are still
+    queued, but a client that falls hard_limit frames behind is disconnected.
+    """
+
+    def __init__(self, websocket: Optional[WebSocket], max_queue: int):
+        self.websocket = websocket
+        self.closed = False
+        self.max_queue = max_queue
+        self.hard_limit = max_queue * 4
+        self.frames: Deque[_Frame] = deque()
+        self.ready = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.peak_depth = 0
+
+    @property
+    def key(self) -> Any:
+        """How the manager tracks this client: its WebSocket, or itself for an event stream."""
+        return self.websocket if self.websocket is not None else self
+
+    def _make_room(self, frame: _Frame) -> Optional[_Frame]:
+        """Free a slot for frame; returns the frame to queue, or None if frame was dropped."""
+        if frame.key is not None:
+            for i, queued in enumerate(self.frames):
+                if queued.key == frame.key:
+                    # The merged frame carries frame's event_id, so it must not jump ahead of older frames
+                    del self.frames[i]
+                    self.coalesced += 1
+                    return _Frame(merge_events(queued.message, frame.message))
+        for i, queued in enumerate(self.frames):
+            if queued.droppable:
+                del self.frames[i]
+                self.dropped += 1
+                return frame
+        if frame.droppable:
+            self.dropped += 1
+            return None
+        return frame
+
+    def enqueue(self, frame: _Frame) -> bool:
+        """Queue frame without waiting on the network; False if the client is too far behind."""
+        if len(self.frames) >= self.max_queue:
+            frame = self._make_room(frame)
+            if frame is None:
+                return True
+        if len(self.frames) >= self.hard_limit:
+            return False
+        self.frames.append(frame)
+        self.peak_depth = max(self.peak_depth, len(self.frames))
+        self.ready.set()
+        return True
+
+
 class WebSocketManager:
-    def __init__(self):
+    def __init__(self, event_bus: EventBus = None, coalesce_window: Optional[float] = None,
+                 send_queue_size: Optional[int] = None):
         # Store active connections for each job
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+        self.active_connections: Dict[str, Dict[WebSocket, _Connection]] = {}
+        # Events travel through the bus so connections on other workers receive them too
+        self.event_bus = event_bus or EventBus()
+        self.event_bus.subscribe(self.deliver)
+        # Token and per-document updates are merged into snapshots before they reach the bus
+        if coalesce_window is None:
+            coalesce_window = float(os.getenv("WS_COALESCE_WINDOW_MS", "100")) / 1000
+        self.coalescer = EventCoalescer(self._publish, coalesce_window)
+        # Recent events per job, replayed to clients that connect late or reconnect
+        self.history = create_event_history()
+        # Each client gets its own outbound queue so a slow one delays nobody else
+        self.send_queue_size = send_queue_size or int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.slow_disconnects = 0
         
-    async def connect(self, websocket: WebSocket, job_id: str):
-        """Connect a new client to a specific job."""
-        if job_id not in self.active_connections:
-            self.active_connections[job_id] = set()
-        self.active_connections[job_id].add(websocket)
+    async def connect(self, websocket: WebSocket, job_id: str, last_event_id: Optional[int] = None,
+                      snapshot: Optional[dict] = None) -> int:
+        """Connect a new client to a specific job.
+
+        The client is first sent the job's retained events after last_event_id
+        (all of them if None), or snapshot alone when there are none; returns
+        how many events were replayed.
+        """
+        connection, replayed = self._attach(job_id, websocket, last_event_id, snapshot)
+        connection.writer = asyncio.create_task(self._write(job_id, connection))
         logger.info(f"New WebSocket connection for job {job_id}")
-        logger.info(f"Total connections for job: {len(self.active_connections[job_id])}")
-        logger.info(f"All active jobs: {list(self.active_connections.keys())}")
-        
-    def disconnect(self, websocket: WebSocket, job_id: str):
+        logger.info(f"Total connections for job: {len(self.active_connections[job_id])}, replayed {replayed} events")
+        return replayed
+
+    def _attach(self, job_id: str, websocket: Optional[WebSocket], last_event_id: Optional[int],
+                snapshot: Optional[dict] = None):
+        """Register a client, queueing the retained events it has not seen yet.
+
+        The snapshot goes to this client only and gets no event_id, so it
+        cannot collide with the ids of the job's own events.
+        """
+        connection = _Connection(websocket, self.send_queue_size)
+        backlog = self.history.since(job_id, last_event_id)
+        if backlog:
+            connection.frames.extend(backlog)
+            connection.peak_depth = len(backlog)
+            connection.ready.set()
+        elif snapshot:
+            connection.enqueue(_Frame({**snapshot, "timestamp": datetime.now().isoformat()}))
+        self.active_connections.setdefault(job_id, {})[connection.key] = connection
+        return connection, len(backlog)
+
+    async def stream(self, job_id: str, last_event_id: Optional[int] = None, heartbeat: float = 15.0,
+                     snapshot: Optional[dict] = None) -> AsyncIterator[str]:
+        """Server-sent events for a job: retained events after last_event_id, then live ones.
+
+        snapshot is sent to this client alone when there is nothing to replay.
+        A comment line is sent after heartbeat idle seconds to keep proxies from
+        closing the stream, which ends after the job's completed or failed event.
+        """
+        connection, replayed = self._attach(job_id, None, last_event_id, snapshot)
+        logger.info(f"New event stream for job {job_id}, replayed {replayed} events")
+        try:
+            yield "retry: 2000\n\n"
+            while not connection.closed:
+                if not connection.frames:
+                    connection.ready.clear()
+                    try:
+                        await asyncio.wait_for(connection.ready.wait(), heartbeat)
+                    except asyncio.TimeoutError:
+                        yield ": heartbeat\n\n"
+                    continue
+                frame = connection.frames.popleft()
+                yield frame.sse()
+                connection.sent += 1
+                if (frame.message.get("data") or {}).get("status") in TERMINAL_STATUSES:
+                    break
+        finally:
+            self.disconnect(connection.key, job_id)
+
+    def disconnect(self, websocket: Any, job_id: str):
         """Disconnect a client from a specific job."""
         if job_id in self.active_connections:
-            self.active_connections[job_id].discard(websocket)
+            connection = self.active_connections[job_id].pop(websocket, None)
             if not self.active_connections[job_id]:
                 del self.active_connections[job_id]
+            if connection:
+                connection.closed = True
+                connection.ready.set()
+                self.sent += connection.sent
+                self.coalesced += connection.coalesced
+                self.dropped += connection.dropped
+                if connection.writer and connection.writer is not asyncio.current_task():
+                    connection.writer.cancel()
             logger.info(f"WebSocket disconnected for job {job_id}")
-            logger.info(f"Remaining connections for job: {len(self.active_connections.get(job_id, set()))}")
-            logger.info(f"Remaining active jobs: {list(self.active_connections.keys())}")
+            logger.info(f"Remaining connections for job: {len(self.active_connections.get(job_id, {}))}")
+
+    async def _write(self, job_id: str, connection: _Connection):
+        """Drain one client's queue; a failed send drops the client."""
+        try:
+            while True:
+                while not connection.frames:
+                    connection.ready.clear()
+                    await connection.ready.wait()
+                frame = connection.frames.popleft()
+                with metrics.timer("send", "websocket", job_id):
+                    await connection.websocket.send_text(frame.text)
+                connection.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Error sending message to client for job {job_id}: {str(e)}")
+            self.disconnect(connection.websocket, job_id)
                 
     async def broadcast_to_job(self, job_id: str, message: dict):
-        """Send a message to all clients connected to a specific job."""
-        if job_id not in self.active_connections:
-            logger.warning(f"No active connections for job {job_id}")
-            return
-            
+        """Send a message to all clients connected to a specific job, on any worker."""
         # Add timestamp to message
         message["timestamp"] = datetime.now().isoformat()
+        await self.coalescer.send(job_id, message)
+
+    async def _publish(self, job_id: str, message: dict):
+        """Number the job's event and put it on the bus."""
+        message["event_id"] = self.history.next_id(job_id)
+        await self.event_bus.publish(job_id, message)
+
+    async def deliver(self, job_id: str, message: dict):
+        """Record a bus message and queue it for this worker's clients for the job."""
+        # Serialize once; the same frame is kept for replay and handed to each client's writer
+        frame = _Frame(message)
+        if (event_id := message.get("event_id")) is not None:
+            self.history.append(job_id, event_id, frame)
+
+        if job_id not in self.active_connections:
+            logger.debug(f"No active connections for job {job_id}")
+            return
         
-        # Convert message to JSON string
-        message_str = json.dumps(message)
-        logger.info(f"Message content: {message_str}")
-        
-        # Send to all connected clients for this job
-        success_count = 0
-        disconnected = set()
-        for connection in self.active_connections[job_id]:
-            try:
-                await connection.send_text(message_str)
-                success_count += 1
-            except Exception as e:
-                logger.error(f"Error sending message to client: {str(e)}", exc_info=True)
-                disconnected.add(connection)
+        too_slow = [
+            connection for connection in self.active_connections[job_id].values()
+            if not connection.enqueue(frame)
+        ]
         
-        # Clean up disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection, job_id)
+        # Clients that fell too far behind are dropped rather than buffered without bound
+        for connection in too_slow:
+            logger.warning(f"Disconnecting client for job {job_id}: {len(connection.frames)} messages behind")
+            self.slow_disconnects += 1
+            self.disconnect(connection.key, job_id)
+            if connection.websocket is not None:
+                asyncio.ensure_future(self._close(connection.websocket))
+
+    @staticmethod
+    async def _close(websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
             
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "jobs": len(self.active_connections),
+            "connections": sum(len(connections) for connections in self.active_connections.values()),
+            "event_streams": sum(
+                1 for connections in self.active_connections.values()
+                for connection in connections.values() if connection.websocket is None
+            ),
+            "send_queues": self._queue_stats(),
+            "history": self.history.stats(),
+            "events": self.coalescer.stats()
+        }
+
+    def _queue_stats(self) -> Dict[str, Any]:
+        connections = [
+            connection for connections in self.active_connections.values() for connection in connections.values()
+        ]
+        depths = [len(connection.frames) for connection in connections]
+        return {
+            "max_size": self.send_queue_size,
+            "queued": sum(depths),
+            "max_depth": max(depths, default=0),
+            "peak_depth": max((connection.peak_depth for connection in connections), default=0),
+            "sent": self.sent + sum(connection.sent for connection in connections),
+            "coalesced": self.coalesced + sum(connection.coalesced for connection in connections),
+            "dropped": self.dropped + sum(connection.dropped for connection in connections),
+            "slow_disconnects": self.slow_disconnects
+        }
+
     async def send_status_update(self, job_id: str, status: str, message: str = None, error: str = None, result: dict = None):
         """Helper method to send formatted status updates."""
-        update = {
-            "type": "status_update",
-            "data": {
-                "status": status,
-                "message": message,
-                "error": error,
-                "result": result
-            }
-        }
+        update = status_update(status, message, error, result)
         #logger.info(f"Status: {status}, Message: {message}")
         await self.broadcast_to_job(job_id, update)
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Event-loop stall check for the Briefing node.
+
+Runs Briefing.create_briefings against a stand-in Gemini model whose async API
+awaits for --llm-latency seconds and whose sync API blocks for the same time.
+A heartbeat task measures how late the loop wakes it; if briefing ever blocks
+the loop (e.g. by calling generate_content synchronously) the worst lag jumps
+to roughly the LLM latency and the script exits non-zero.
+
+    python -m benchmarks.briefing_loop_lag --threshold-ms 100
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-placeholder")
+
+from backend.nodes.briefing import Briefing  # noqa: E402
+
+
+class _Response:
+    text = "### Section\n* Briefing bullet"
+
+
+class StandInModel:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        return _Response()
+
+    async def generate_content_async(self, prompt):
+        await asyncio.sleep(self.latency)
+        return _Response()
+
+
+async def heartbeat(interval: float, lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+def research_state() -> dict:
+    docs = {
+        f"https://example.com/{i}": {"title": f"Doc {i}", "content": "content " * 200}
+        for i in range(5)
+    }
+    return {
+        "company": "Acme",
+        "curated_financial_data": dict(docs),
+        "curated_news_data": dict(docs),
+        "curated_industry_data": dict(docs),
+        "curated_company_data": dict(docs),
+    }
+
+
+async def run(llm_latency: float) -> float:
+    briefing = Briefing()
+    briefing.gemini_model = StandInModel(llm_latency)
+
+    lags: list = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(0.01, lags, stop))
+    state = await briefing.create_briefings(research_state())
+    stop.set()
+    await monitor
+
+    assert len(state["briefings"]) == 4, state["briefings"]
+    return max(lags) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--threshold-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    worst_lag = asyncio.run(run(args.llm_latency))
+    print(f"worst event-loop lag during briefing: {worst_lag:.1f} ms (threshold {args.threshold_ms:.0f} ms)")
+    if worst_lag > args.threshold_ms:
+        print("FAIL: briefing stalled the event loop")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
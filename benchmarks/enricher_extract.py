@@ -0,0 +1,87 @@
+"""Enricher extraction against a local Tavily stub: per-URL vs. batched requests.
+
+The stub charges a fixed round-trip latency per request plus the slowest
+page fetch in it (pages in a request are fetched in parallel server-side)
+and fails a fraction of URLs. "per-url" replays the old behaviour
+(one extract call per URL, batches of 20, 3 batches at a time); "batched"
+runs Enricher.fetch_raw_content, which sends one multi-URL request per batch.
+
+    python -m benchmarks.enricher_extract --urls 120 --rtt-ms 400
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("TAVILY_API_KEY", "benchmark-placeholder")
+os.environ["CONTENT_STORE"] = "off"  # measure extraction, not the content store
+
+from backend.nodes.enricher import Enricher  # noqa: E402
+
+
+class StubTavily:
+    def __init__(self, rtt: float, fetch: float, failure_rate: float, seed: int = 7):
+        self.rtt = rtt
+        self.fetch = fetch
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+
+    async def extract(self, urls, **kwargs):
+        urls = [urls] if isinstance(urls, str) else list(urls)
+        self.requests += 1
+        await asyncio.sleep(self.rtt + max(self.random.uniform(0.5, 1.5) * self.fetch for _ in urls))
+        results, failed = [], []
+        for url in urls:
+            if self.random.random() < self.failure_rate:
+                failed.append({"url": url, "error": "Failed to fetch url"})
+            else:
+                results.append({"url": url, "raw_content": f"content of {url}"})
+        return {"results": results, "failed_results": failed}
+
+
+async def per_url_extract(client: StubTavily, urls, batch_size: int = 20) -> int:
+    semaphore = asyncio.Semaphore(3)
+
+    async def single(url):
+        result = await client.extract(url)
+        return bool(result["results"])
+
+    async def batch(batch_urls):
+        async with semaphore:
+            return await asyncio.gather(*[single(url) for url in batch_urls])
+
+    batches = [urls[i:i + batch_size] for i in range(0, len(urls), batch_size)]
+    results = await asyncio.gather(*[batch(b) for b in batches])
+    return sum(sum(r) for r in results)
+
+
+async def batched_extract(client: StubTavily, urls) -> int:
+    enricher = Enricher()
+    enricher.tavily_client = client
+    contents = await enricher.fetch_raw_content(urls)
+    return sum(1 for content in contents.values() if isinstance(content, str) and content)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--urls", type=int, default=120)
+    parser.add_argument("--rtt-ms", type=float, default=400.0)
+    parser.add_argument("--fetch-ms", type=float, default=300.0)
+    parser.add_argument("--failure-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    urls = [f"https://example{i % 17}.com/page/{i}" for i in range(args.urls)]
+    print(f"{args.urls} URLs, {args.rtt_ms:.0f} ms round trip + ~{args.fetch_ms:.0f} ms page fetch")
+    for name, run in (("per-url", per_url_extract), ("batched", batched_extract)):
+        client = StubTavily(args.rtt_ms / 1000, args.fetch_ms / 1000, args.failure_rate)
+        start = time.perf_counter()
+        extracted = asyncio.run(run(client, urls))
+        elapsed = time.perf_counter() - start
+        print(f"{name:>8}: {client.requests:4d} requests  {elapsed:6.2f} s  {extracted} pages extracted")
+
+
+if __name__ == "__main__":
+    main()
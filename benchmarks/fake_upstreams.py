@@ -0,0 +1,172 @@
+"""Offline stand-ins for AsyncTavilyClient, AsyncOpenAI and genai.GenerativeModel.
+
+Each fake answers in the shape the workflow nodes read, after a latency
+drawn from a log-normal distribution, and fails a configurable fraction of
+calls. Install them with clients.override() before the graph is built.
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+WORDS = (
+    "revenue growth platform customers market cloud database enterprise product "
+    "strategy funding leadership partnership expansion analytics infrastructure "
+    "competition pricing security developer adoption quarter announced reported"
+).split()
+
+
+class InjectedFault(Exception):
+    """Raised by a fake upstream to simulate a failed call."""
+
+
+@dataclass
+class Upstream:
+    """Latency and failure model for one fake upstream.
+
+    Latencies are log-normal with the given median; sigma sets the spread
+    (0.5 puts p95 at about 2.3x the median). Every latency is multiplied by
+    scale so a run can be compressed in time.
+    """
+
+    name: str
+    median_ms: float
+    sigma: float = 0.5
+    error_rate: float = 0.0
+    scale: float = 1.0
+    rng: Optional[random.Random] = None
+
+    def __post_init__(self) -> None:
+        self.rng = self.rng or random.Random()
+        self.calls = 0
+        self.errors = 0
+
+    def latency(self) -> float:
+        return self.scale * self.median_ms / 1000 * math.exp(self.sigma * self.rng.gauss(0, 1))
+
+    async def call(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.latency())
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            raise InjectedFault(f"Injected {self.name} failure")
+
+
+def text(rng: random.Random, size: int) -> str:
+    """About size characters of sentence-like filler."""
+    sentences = []
+    length = 0
+    while length < size:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16))).capitalize() + "."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+
+class FakeTavily:
+    def __init__(self, search: Upstream, extract: Upstream, results: int = 5, page_kb: float = 20,
+                 domains: int = 200) -> None:
+        self.search_upstream = search
+        self.extract_upstream = extract
+        self.results = results
+        self.page_size = int(page_kb * 1024)
+        self.domains = [f"site{i}.example.com" for i in range(domains)]
+        self.rng = search.rng
+
+    async def search(self, query: str, **params: Any) -> Dict[str, Any]:
+        await self.search_upstream.call()
+        slug = re.sub(r"\W+", "-", query.lower()).strip("-")
+        return {
+            "query": query,
+            "results": [
+                {
+                    "url": f"https://{self.rng.choice(self.domains)}/{slug}/{i}",
+                    "title": f"{query} ({i + 1})",
+                    "content": text(self.rng, 400),
+                    "score": round(self.rng.uniform(0.2, 0.95), 3)
+                }
+                for i in range(self.results)
+            ]
+        }
+
+    async def extract(self, urls: Any, **params: Any) -> Dict[str, Any]:
+        # The error rate applies to the whole request and again to each URL in it
+        await self.extract_upstream.call()
+        results, failed = [], []
+        for url in [urls] if isinstance(urls, str) else urls:
+            if self.rng.random() < self.extract_upstream.error_rate:
+                failed.append({"url": url, "error": "Injected extraction failure"})
+            else:
+                results.append({"url": url, "raw_content": text(self.rng, self.page_size)})
+        return {"results": results, "failed_results": failed}
+
+
+def _chunk(content: Optional[str], finish_reason: Optional[str] = None) -> SimpleNamespace:
+    delta = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+
+def _completion(content: str) -> SimpleNamespace:
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")])
+
+
+class FakeOpenAI:
+    """Answers query generation, JSON query plans and report editing like chat.completions.create."""
+
+    def __init__(self, upstream: Upstream, token_ms: float = 10, report_kb: float = 12) -> None:
+        self.upstream = upstream
+        self.token_seconds = upstream.scale * token_ms / 1000
+        self.report_size = int(report_kb * 1024)
+        self.rng = upstream.rng
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _queries(self, company: str, category: str, count: int = 4) -> List[str]:
+        year = datetime.now().year
+        return [f"{company} {category.replace('_', ' ')} {self.rng.choice(WORDS)} {year} {i}" for i in range(count)]
+
+    def _report(self) -> str:
+        sections = [f"## Chapter {i}\n\n{text(self.rng, self.report_size // 8)}" for i in range(1, 9)]
+        return "# Company Report\n\n" + "\n\n".join(sections)
+
+    async def _stream(self, content: str) -> AsyncIterator[SimpleNamespace]:
+        tokens = re.findall(r"\S+\s*|\n", content)
+        for i, token in enumerate(tokens):
+            # Sleep per batch of tokens; one timer per token would dominate the benchmark's own CPU
+            if i % 16 == 15:
+                await asyncio.sleep(16 * self.token_seconds)
+            yield _chunk(token)
+        yield _chunk(None, "stop")
+
+    async def create(self, model: str, messages: List[Dict[str, str]], stream: bool = False,
+                     response_format: Optional[Dict[str, str]] = None, **params: Any) -> Any:
+        await self.upstream.call()
+        system, user = messages[0]["content"], messages[-1]["content"]
+        company = m.group(1) if (m := re.match(r"You are researching (.+?), a company", system)) else "Company"
+
+        if response_format and response_format.get("type") == "json_object":
+            categories = re.findall(r'"(\w+)": \["\.\.\."\]', user)
+            return _completion(json.dumps({category: self._queries(company, category) for category in categories}))
+        if system.startswith("You are researching"):
+            content = "\n".join(self._queries(company, "research"))
+        else:
+            content = self._report()
+        return self._stream(content) if stream else _completion(content)
+
+
+class FakeGemini:
+    """Answers generate_content_async with a briefing of briefing_kb."""
+
+    def __init__(self, upstream: Upstream, briefing_kb: float = 4) -> None:
+        self.upstream = upstream
+        self.briefing_size = int(briefing_kb * 1024)
+
+    async def generate_content_async(self, prompt: str, **params: Any) -> SimpleNamespace:
+        await self.upstream.call()
+        return SimpleNamespace(text=text(self.upstream.rng, self.briefing_size))
@@ -0,0 +1,82 @@
+"""Per-job graph setup cost, before and after sharing the compiled workflow.
+
+"before" rebuilds every node, each with its own freshly built upstream
+clients, and recompiles the StateGraph for each job, which is what
+process_research used to do. "after" is the current path: a Graph handle over
+the process-wide compiled workflow and shared clients.
+
+Run from the repository root:
+
+    python -m benchmarks.graph_setup --jobs 50
+"""
+
+import argparse
+import os
+import time
+from contextlib import contextmanager
+
+# Clients are only constructed here, never called, so placeholder keys suffice.
+for key in ("TAVILY_API_KEY", "OPENAI_API_KEY", "GEMINI_API_KEY"):
+    os.environ.setdefault(key, "benchmark-placeholder")
+
+from backend.graph import Graph, build_workflow, get_compiled_graph, get_nodes  # noqa: E402
+from backend.services.clients import UpstreamClients, clients  # noqa: E402
+
+
+@contextmanager
+def unshared_clients():
+    """Build a new client for every request to the registry, as each node once did for itself."""
+    def fresh(name):
+        method = getattr(UpstreamClients, name).__get__(clients)
+
+        def build(*args, **kwargs):
+            clients._tavily = clients._openai = None
+            clients._gemini_models.clear()
+            return method(*args, **kwargs)
+        return build
+
+    for name in ("tavily", "openai", "gemini"):
+        setattr(clients, name, fresh(name))
+    try:
+        yield
+    finally:
+        for name in ("tavily", "openai", "gemini"):
+            delattr(clients, name)
+
+
+def per_job_rebuild() -> None:
+    get_nodes.cache_clear()
+    with unshared_clients():
+        build_workflow(get_nodes()).compile()
+
+
+def shared_graph() -> None:
+    Graph(company="Acme", url="https://acme.example", job_id="bench").compile()
+
+
+def measure(fn, jobs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(jobs):
+        fn()
+    return (time.perf_counter() - start) / jobs * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=50)
+    args = parser.parse_args()
+
+    before = measure(per_job_rebuild, args.jobs)
+    get_nodes.cache_clear()
+    get_compiled_graph.cache_clear()
+    get_compiled_graph()  # first job pays the one-off cost
+    after = measure(shared_graph, args.jobs)
+
+    print(f"jobs: {args.jobs}")
+    print(f"before (rebuild per job): {before:8.3f} ms/job")
+    print(f"after  (shared graph):    {after:8.3f} ms/job")
+    print(f"speedup: {before / after:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
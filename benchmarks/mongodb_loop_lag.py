@@ -0,0 +1,73 @@
+"""Event-loop lag from MongoDB persistence, blocking vs. offloaded.
+
+Simulates concurrent jobs each doing the create/update/store/get calls of
+process_research against InMemoryMongoDBService with a fixed round-trip
+latency. "blocking" calls the sync service on the event loop as
+process_research used to; "async" goes through AsyncMongoDBService.
+
+    python -m benchmarks.mongodb_loop_lag --jobs 20 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import time
+
+from backend.services.mongodb import AsyncMongoDBService, InMemoryMongoDBService
+
+
+async def heartbeat(interval: float, lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def blocking_job(db: InMemoryMongoDBService, job_id: str) -> None:
+    db.create_job(job_id, {"company": "Acme"})
+    await asyncio.sleep(0)
+    db.update_job(job_id, status="completed")
+    db.store_report(job_id, {"report": "# Report"})
+    db.get_report(job_id)
+
+
+async def async_job(db: AsyncMongoDBService, job_id: str) -> None:
+    await db.create_job(job_id, {"company": "Acme"})
+    await asyncio.sleep(0)
+    await db.update_job(job_id, status="completed")
+    await db.store_report(job_id, {"report": "# Report"})
+    await db.get_report(job_id)
+
+
+async def run(job, db, jobs: int):
+    lags: list = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(0.005, lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*[job(db, f"job-{i}") for i in range(jobs)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+    lags.sort()
+    return elapsed, lags[len(lags) // 2] * 1000, lags[-1] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    results = {
+        "blocking": asyncio.run(run(blocking_job, InMemoryMongoDBService(latency), args.jobs)),
+        "async": asyncio.run(run(async_job, AsyncMongoDBService(InMemoryMongoDBService(latency), args.workers), args.jobs)),
+    }
+
+    print(f"{args.jobs} jobs, {args.latency_ms:.0f} ms per database round trip")
+    for name, (elapsed, p50, worst) in results.items():
+        print(f"{name:>8}: total {elapsed:6.2f} s  loop lag p50 {p50:7.1f} ms  max {worst:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""End-to-end throughput of the research pipeline against fake upstreams.
+
+Serves the real FastAPI app with uvicorn in this process, with Tavily,
+OpenAI and Gemini replaced by the fakes in benchmarks.fake_upstreams, and
+submits --jobs research requests at once through POST /research. Each job
+is followed over its /research/{job_id}/events stream until it completes or
+fails. Reports job latency percentiles, jobs per minute, peak RSS and
+event-loop lag. No API keys are needed and nothing leaves the machine.
+
+Upstream medians default to roughly production latencies and are
+multiplied by --scale (0.1 by default) to keep runs short.
+
+    python -m benchmarks.pipeline_load --jobs 20 --concurrency 4
+    python -m benchmarks.pipeline_load --jobs 50 --concurrency 8 --error-rate 0.05 --scale 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import statistics
+import time
+from typing import Dict, List
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def follow_job(http, company: str) -> Dict[str, object]:
+    started = time.perf_counter()
+    response = await http.post("/research", json={"company": company, "industry": "Software"})
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+    status, events = "unknown", 0
+    async with http.stream("GET", f"/research/{job_id}/events") as stream:
+        async for line in stream.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            events += 1
+            message = json.loads(line[5:])
+            if message.get("type") == "status_update":
+                status = message["data"]["status"]
+                if status in ("completed", "failed"):
+                    break
+    return {"seconds": time.perf_counter() - started, "status": status, "events": events}
+
+
+async def monitor_loop_lag(lags: List[float], stop: asyncio.Event, interval: float = 0.05) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def run(args: argparse.Namespace) -> None:
+    import httpx
+    import uvicorn
+
+    import application
+    from backend.services.clients import clients
+    from benchmarks.fake_upstreams import FakeGemini, FakeOpenAI, FakeTavily, Upstream
+
+    rng = random.Random(args.seed)
+
+    def upstream(name: str, median_ms: float) -> Upstream:
+        return Upstream(name, median_ms, sigma=args.sigma, error_rate=args.error_rate, scale=args.scale, rng=rng)
+
+    upstreams = {
+        "tavily_search": upstream("tavily_search", args.search_ms),
+        "tavily_extract": upstream("tavily_extract", args.extract_ms),
+        "openai": upstream("openai", args.openai_ms),
+        "gemini": upstream("gemini", args.gemini_ms)
+    }
+    clients.override(
+        tavily=FakeTavily(upstreams["tavily_search"], upstreams["tavily_extract"],
+                          results=args.results, page_kb=args.page_kb),
+        openai=FakeOpenAI(upstreams["openai"], token_ms=args.token_ms, report_kb=args.report_kb),
+        gemini=FakeGemini(upstreams["gemini"], briefing_kb=args.briefing_kb)
+    )
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.CRITICAL)
+
+    server = uvicorn.Server(uvicorn.Config(application.app, host="127.0.0.1", port=args.port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    lag_monitor = asyncio.create_task(monitor_loop_lag(lags, stop))
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=None, limits=limits) as http:
+        started = time.perf_counter()
+        results = await asyncio.gather(*[follow_job(http, f"Company {i}") for i in range(args.jobs)])
+        wall = time.perf_counter() - started
+
+    stop.set()
+    await lag_monitor
+    server.should_exit = True
+    await serving
+
+    latencies = [result["seconds"] for result in results]
+    completed = sum(1 for result in results if result["status"] == "completed")
+    print(f"jobs: {args.jobs} submitted, {completed} completed, {args.jobs - completed} failed, "
+          f"{args.concurrency} concurrent, scale {args.scale}")
+    print(f"job latency: p50 {percentile(latencies, 0.5):6.2f} s  p95 {percentile(latencies, 0.95):6.2f} s  "
+          f"p99 {percentile(latencies, 0.99):6.2f} s")
+    print(f"throughput: {60 * completed / wall:6.1f} jobs/min over {wall:.1f} s")
+    print(f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:6.1f} MiB "
+          f"(before jobs {rss_before / 1024:.1f} MiB)")
+    print(f"event-loop lag: p50 {1000 * percentile(lags, 0.5):6.1f} ms  p99 {1000 * percentile(lags, 0.99):6.1f} ms  "
+          f"max {1000 * max(lags, default=0):6.1f} ms")
+    print(f"events per job: {statistics.mean(result['events'] for result in results):.0f}")
+    print("upstream calls: " + "  ".join(
+        f"{name} {upstream.calls} ({upstream.errors} failed)" for name, upstream in upstreams.items()
+    ))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4, help="MAX_CONCURRENT_JOBS for the app")
+    parser.add_argument("--scale", type=float, default=0.1, help="multiplier applied to every fake latency")
+    parser.add_argument("--search-ms", type=float, default=1200, help="median Tavily search latency")
+    parser.add_argument("--extract-ms", type=float, default=4000, help="median Tavily extract latency")
+    parser.add_argument("--openai-ms", type=float, default=800, help="median OpenAI time to first token")
+    parser.add_argument("--token-ms", type=float, default=10, help="OpenAI streaming time per token")
+    parser.add_argument("--gemini-ms", type=float, default=6000, help="median Gemini briefing latency")
+    parser.add_argument("--sigma", type=float, default=0.5, help="log-normal spread of every latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake calls that fail")
+    parser.add_argument("--results", type=int, default=5, help="results per search")
+    parser.add_argument("--page-kb", type=float, default=20, help="size of each extracted page")
+    parser.add_argument("--briefing-kb", type=float, default=4)
+    parser.add_argument("--report-kb", type=float, default=12)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--verbose", action="store_true", help="keep the app's logging")
+    args = parser.parse_args()
+
+    # Configure the app before it is imported: no keys, no caches, room for every job
+    for key in ("TAVILY_API_KEY", "OPENAI_API_KEY", "GEMINI_API_KEY"):
+        os.environ.setdefault(key, "benchmark-placeholder")
+    os.environ.update({
+        "SEARCH_CACHE": "off",
+        "CONTENT_STORE": "off",
+        "DOMAIN_BREAKER": "off",
+        "MAX_CONCURRENT_JOBS": str(args.concurrency),
+        "MAX_QUEUED_JOBS": str(args.jobs)
+    })
+    os.environ.pop("MONGODB_URI", None)
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
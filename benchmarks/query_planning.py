@@ -0,0 +1,86 @@
+"""Query planning modes compared on live APIs: LLM-planned vs. template ("fast") queries.
+
+For each company both modes plan the four analysts' queries and search them
+with Tavily. The benchmark reports planning latency, time until every search
+has answered, and how many distinct documents were found and would pass the
+Curator's relevance threshold. The search cache is disabled so both modes hit
+Tavily. Needs TAVILY_API_KEY and OPENAI_API_KEY (GEMINI_API_KEY is only
+required to construct the graph nodes).
+
+    python -m benchmarks.query_planning --company "Tavily" --industry "AI search" \\
+        --company "Stripe" --industry "Payments"
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ["SEARCH_CACHE"] = "off"
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-placeholder")
+
+from backend.graph import RESEARCH_NODES, get_nodes  # noqa: E402
+
+
+async def run_mode(mode: str, company: str, industry: str) -> dict:
+    nodes = get_nodes()
+    planner = nodes["query_planner"]
+    researchers = [nodes[name] for name in RESEARCH_NODES]
+    state = {"company": company, "industry": industry, "messages": []}
+
+    started = time.perf_counter()
+    plan = (await planner.plan_queries(state, mode))["query_plan"]
+    planned = time.perf_counter()
+
+    results = await asyncio.gather(*[
+        researcher.search_documents(state, plan.get(researcher.analyst_type, []))
+        for researcher in researchers
+    ])
+    searched = time.perf_counter()
+
+    documents = {}
+    for result in results:
+        documents.update(result)
+    threshold = nodes["curator"].relevance_threshold
+    curated = sum(1 for doc in documents.values() if float(doc.get("score", 0)) >= threshold)
+    return {
+        "plan_ms": 1000 * (planned - started),
+        "total_ms": 1000 * (searched - started),
+        "queries": sum(len(queries) for queries in plan.values()),
+        "documents": len(documents),
+        "curated": curated
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--company", action="append", required=True)
+    parser.add_argument("--industry", action="append", default=[])
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+    industries = args.industry + [""] * (len(args.company) - len(args.industry))
+
+    totals = {"llm": [], "fast": []}
+    for company, industry in zip(args.company, industries):
+        for _ in range(args.repeat):
+            for mode in ("llm", "fast"):
+                result = await run_mode(mode, company, industry or None)
+                totals[mode].append(result)
+                print(
+                    f"{company:>16} {mode:>4}: plan {result['plan_ms']:7.0f} ms  "
+                    f"plan+search {result['total_ms']:7.0f} ms  {result['queries']:2d} queries  "
+                    f"{result['documents']:3d} docs  {result['curated']:3d} curated"
+                )
+
+    print()
+    for mode, results in totals.items():
+        print(
+            f"{mode:>4} median: plan {statistics.median(r['plan_ms'] for r in results):7.0f} ms  "
+            f"plan+search {statistics.median(r['total_ms'] for r in results):7.0f} ms  "
+            f"curated {statistics.mean(r['curated'] for r in results):5.1f}/job"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
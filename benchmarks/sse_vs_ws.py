@@ -0,0 +1,139 @@
+"""Server memory per viewer: WebSocket vs. server-sent events.
+
+Starts the real FastAPI app with uvicorn in a child process, seeds one job
+that emits a status update every --interval-ms, then opens --viewers
+connections to it over one transport and reports the growth in the server's
+resident memory per connection and the events each viewer received. Each
+transport gets a fresh server so they are measured from the same baseline.
+Linux only (reads /proc).
+
+    python -m benchmarks.sse_vs_ws --viewers 500
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import websockets
+
+JOB_ID = "benchmark-job"
+
+
+def serve(port: int, interval: float) -> None:
+    import uvicorn
+
+    import application
+
+    async def emit() -> None:
+        i = 0
+        while True:
+            i += 1
+            await application.manager.send_status_update(
+                JOB_ID, status="processing", message=f"Benchmark event {i}", result={"step": "Benchmark", "i": i}
+            )
+            await asyncio.sleep(interval)
+
+    @application.app.on_event("startup")
+    async def start_emitter() -> None:
+        application.job_status.update(JOB_ID, status="processing")
+        asyncio.get_running_loop().create_task(emit())
+
+    uvicorn.run(application.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def rss_kib(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+async def websocket_viewer(port: int, received: list, ready: asyncio.Event, stop: asyncio.Event) -> None:
+    async with websockets.connect(f"ws://127.0.0.1:{port}/research/ws/{JOB_ID}", max_queue=None) as ws:
+        index = len(received)
+        received.append(0)
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(ws.recv(), 0.5)
+            except asyncio.TimeoutError:
+                continue
+            received[index] += 1
+            ready.set()
+
+
+async def sse_viewer(client: httpx.AsyncClient, port: int, received: list, ready: asyncio.Event,
+                     stop: asyncio.Event) -> None:
+    async with client.stream("GET", f"http://127.0.0.1:{port}/research/{JOB_ID}/events") as response:
+        index = len(received)
+        received.append(0)
+        async for line in response.aiter_lines():
+            if line.startswith("data:"):
+                received[index] += 1
+                ready.set()
+            if stop.is_set():
+                break
+
+
+async def measure(transport: str, port: int, pid: int, viewers: int, hold: float) -> None:
+    baseline = rss_kib(pid)
+    received: list = []
+    stop = asyncio.Event()
+    readies = [asyncio.Event() for _ in range(viewers)]
+    client = httpx.AsyncClient(timeout=None, limits=httpx.Limits(max_connections=None, max_keepalive_connections=0))
+    if transport == "websocket":
+        tasks = [asyncio.create_task(websocket_viewer(port, received, ready, stop)) for ready in readies]
+    else:
+        tasks = [asyncio.create_task(sse_viewer(client, port, received, ready, stop)) for ready in readies]
+
+    await asyncio.wait_for(asyncio.gather(*[ready.wait() for ready in readies]), 60)
+    await asyncio.sleep(hold)
+    loaded = rss_kib(pid)
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await client.aclose()
+
+    print(f"{transport:>9}: {viewers} viewers  server RSS {baseline / 1024:6.1f} -> {loaded / 1024:6.1f} MiB  "
+          f"{(loaded - baseline) / viewers:6.1f} KiB/viewer  "
+          f"events/viewer min {min(received)} max {max(received)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--viewers", type=int, default=500)
+    parser.add_argument("--interval-ms", type=float, default=200)
+    parser.add_argument("--hold-seconds", type=float, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.interval_ms / 1000)
+        return
+
+    for transport in ("websocket", "sse"):
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.sse_vs_ws", "--serve", "--port", str(args.port),
+             "--interval-ms", str(args.interval_ms)],
+            env={**os.environ, "WS_COALESCE_WINDOW_MS": "0"},
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            for _ in range(100):
+                try:
+                    httpx.get(f"http://127.0.0.1:{args.port}/admin/websockets", timeout=1)
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.2)
+            asyncio.run(measure(transport, args.port, server.pid, args.viewers, args.hold_seconds))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
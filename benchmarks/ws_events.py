@@ -0,0 +1,112 @@
+"""WebSocket messages and CPU per job, with and without event coalescing.
+
+Replays the status events of a typical job (streamed query tokens, per-document
+curation and extraction updates, streamed report chunks) through
+WebSocketManager to a stub client. "legacy" sends every event and logs its
+full JSON at INFO, as deliver() used to; "coalesced" is the current path with
+a 100 ms window.
+
+    python -m benchmarks.ws_events --jobs 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+from backend.services.websocket_manager import WebSocketManager
+
+
+class StubWebSocket:
+    def __init__(self) -> None:
+        self.messages = 0
+        self.bytes = 0
+
+    async def send_text(self, text: str) -> None:
+        self.messages += 1
+        self.bytes += len(text)
+
+
+class LegacyWebSocketManager(WebSocketManager):
+    """Sends every event immediately and logs its content, like the original deliver()."""
+
+    def __init__(self) -> None:
+        super().__init__(coalesce_window=0)
+
+    async def deliver(self, job_id: str, message: dict):
+        logging.getLogger("backend.services.websocket_manager").info(f"Message content: {json.dumps(message)}")
+        await super().deliver(job_id, message)
+
+
+async def replay_job(manager: WebSocketManager, job_id: str, token_delay: float) -> None:
+    send = manager.send_status_update
+    for category in ("financial_analyzer", "news_analyzer", "industry_analyzer", "company_analyzer"):
+        for number in range(1, 5):
+            query = ""
+            for token in f"{category} research query number {number} with several tokens".split():
+                query += token + " "
+                await send(job_id, "query_generating", "Generating research query",
+                           result={"query": query, "query_number": number, "category": category})
+                await asyncio.sleep(token_delay)
+            await send(job_id, "query_generated", "Generated new research query",
+                       result={"query": query, "query_number": number, "category": category, "is_complete": True})
+    for doc_type in ("financial_data", "news_data", "industry_data", "company_data"):
+        for i in range(15):
+            await send(job_id, "document_kept", f"Kept document {i}",
+                       result={"step": "Curation", "doc_type": doc_type, "title": f"Document {i}", "score": 0.8})
+            await asyncio.sleep(token_delay / 4)
+    await send(job_id, "curation_complete", "Curation complete", result={"step": "Curation"})
+    for category in ("financial", "news", "industry", "company"):
+        for i in range(15):
+            url = f"https://example.com/{category}/{i}"
+            await send(job_id, "extracting", f"Extracting content from {url}",
+                       result={"step": "Enriching", "url": url, "category": category})
+        for i in range(15):
+            url = f"https://example.com/{category}/{i}"
+            await send(job_id, "extracted", f"Successfully extracted content from {url}",
+                       result={"step": "Enriching", "url": url, "category": category, "success": True})
+        await asyncio.sleep(token_delay * 10)
+    await send(job_id, "enrichment_complete", "Enrichment complete", result={"step": "Enriching"})
+    for i in range(300):
+        await send(job_id, "report_chunk", "Formatting final report",
+                   result={"chunk": f"Sentence {i} of the final report. ", "step": "Editor"})
+        await asyncio.sleep(token_delay)
+    await send(job_id, "completed", "Research completed successfully", result={"report": "..."})
+
+
+async def run(manager: WebSocketManager, jobs: int, token_delay: float):
+    sockets = []
+    for i in range(jobs):
+        socket = StubWebSocket()
+        await manager.connect(socket, f"job-{i}")
+        sockets.append(socket)
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    await asyncio.gather(*[replay_job(manager, f"job-{i}", token_delay) for i in range(jobs)])
+    # Let the per-connection writers drain their queues
+    await asyncio.sleep(0.05)
+    return sockets, time.process_time() - cpu, time.perf_counter() - wall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--token-delay-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    # Log to nowhere, but still pay for formatting as a real INFO handler would
+    logging.basicConfig(level=logging.INFO, stream=open(os.devnull, "w"))
+
+    for name, factory in (("legacy", LegacyWebSocketManager), ("coalesced", WebSocketManager)):
+        manager = factory()
+        sockets, cpu, wall = asyncio.run(run(manager, args.jobs, args.token_delay_ms / 1000))
+        messages = sum(socket.messages for socket in sockets) / args.jobs
+        kilobytes = sum(socket.bytes for socket in sockets) / args.jobs / 1024
+        print(f"{name:>9}: {messages:6.0f} messages/job  {kilobytes:7.1f} KiB/job  "
+              f"CPU {1000 * cpu / args.jobs:7.1f} ms/job  wall {wall:5.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""WebSocket fan-out with one slow viewer: sequential sends vs. per-connection queues.
+
+One job is watched by several fast clients and one client whose send_text
+takes --slow-ms. "sequential" awaits each client in turn, as deliver() used
+to; "queued" is the current path where each client has its own writer task.
+Reports how long the emitting coroutine spent in send_status_update, the
+latency at which fast clients received events, and how far the slow client
+fell behind by the end of the run, and checks that every client received
+event ids in increasing order despite its queue overflowing.
+
+    python -m benchmarks.ws_fanout --viewers 5 --events 500
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from backend.services.websocket_manager import WebSocketManager
+
+
+class StubWebSocket:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.latencies = []
+        self.received = 0
+        self.event_ids = []
+
+    async def send_text(self, text: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        message = json.loads(text)
+        self.received += 1
+        self.latencies.append(time.perf_counter() - message["data"]["result"]["sent_at"])
+        if "event_id" in message:
+            self.event_ids.append(message["event_id"])
+
+
+class SequentialWebSocketManager(WebSocketManager):
+    """Awaits every client's send in turn, like the original deliver()."""
+
+    async def deliver(self, job_id: str, message: dict):
+        message_str = json.dumps(message)
+        for connection in list(self.active_connections.get(job_id, {})):
+            await connection.send_text(message_str)
+
+
+async def run(manager: WebSocketManager, viewers: int, events: int, slow: float, interval: float):
+    fast = [StubWebSocket(0) for _ in range(viewers)]
+    slow_socket = StubWebSocket(slow)
+    for socket in [slow_socket] + fast:
+        await manager.connect(socket, "job")
+
+    blocked = 0.0
+    for i in range(events):
+        # Cycle through a non-mergeable event, a query token snapshot, which may be dropped,
+        # and an extraction count, which may only be merged into an earlier one
+        status = ("query_searched", "query_generating", "extracted")[i % 3]
+        started = time.perf_counter()
+        await manager.send_status_update("job", status, result={
+            "category": "news", "query_number": 1, "query": f"token {i}", "sent_at": started
+        })
+        blocked += time.perf_counter() - started
+        await asyncio.sleep(interval)
+    await manager.coalescer.flush("job")
+    await asyncio.sleep(0.05)
+
+    slow_received = slow_socket.received
+
+    # Let the slow client drain its queue so the order check sees everything it was sent
+    connections = list(manager.active_connections["job"].values())
+    while any(connection.frames for connection in connections):
+        await asyncio.sleep(0.01)
+    for socket in [slow_socket] + fast:
+        # A resuming client asks for events after the last id it saw, so ids must never go backwards
+        assert all(a < b for a, b in zip(socket.event_ids, socket.event_ids[1:])), "event ids out of order"
+
+    latencies = [latency for socket in fast for latency in socket.latencies]
+    return blocked, latencies, slow_received
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--viewers", type=int, default=5)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--slow-ms", type=float, default=20.0)
+    parser.add_argument("--interval-ms", type=float, default=1.0)
+    parser.add_argument("--queue-size", type=int, default=64)
+    args = parser.parse_args()
+
+    for name, factory in (("sequential", SequentialWebSocketManager), ("queued", WebSocketManager)):
+        manager = factory(coalesce_window=0, send_queue_size=args.queue_size)
+        blocked, latencies, slow_received = asyncio.run(
+            run(manager, args.viewers, args.events, args.slow_ms / 1000, args.interval_ms / 1000)
+        )
+        latencies.sort()
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        print(f"{name:>10}: emitter blocked {1000 * blocked:7.0f} ms  "
+              f"fast viewers p50 {1000 * statistics.median(latencies):7.1f} ms  p95 {1000 * p95:7.1f} ms  "
+              f"slow viewer received {slow_received}/{args.events}")
+        if name == "queued":
+            print(f"{'':>10}  send queues: {manager.stats()['send_queues']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,7 @@ function App() {
   const [output, setOutput] = useState<ResearchOutput | null>(null);
   const [error, setError] = useState<string | null>(null);
   const wsRef = useRef<WebSocket | null>(null);
+  const lastEventIdRef = useRef<number | null>(null);
   const [isComplete, setIsComplete] = useState(false);
   const [hasFinalReport, setHasFinalReport] = useState(false);
   const [reconnectAttempts, setReconnectAttempts] = useState(0);
@@ -161,7 +162,10 @@ function App() {
     
     console.log("Connecting to WebSocket URL:", wsUrl);
     
-    const ws = new WebSocket(wsUrl);
+    // Resume after the last event we saw; the server replays anything missed
+    const ws = new WebSocket(
+      lastEventIdRef.current === null ? wsUrl : `${wsUrl}?last_event_id=${lastEventIdRef.current}`
+    );
 
     ws.onopen = () => {
       console.log("WebSocket connection established for job:", jobId);
@@ -224,6 +228,9 @@ function App() {
 
     ws.onmessage = (event) => {
       const rawData = JSON.parse(event.data);
+      if (typeof rawData.event_id === "number") {
+        lastEventIdRef.current = rawData.event_id;
+      }
 
       if (rawData.type === "status_update") {
         const statusData = rawData.data;
@@ -362,7 +369,8 @@ function App() {
                       ...prev.enrichmentCounts,
                       [category]: {
                         ...currentCounts,
-                        enriched: Math.min(currentCounts.enriched + 1, currentCounts.total)
+                        // Coalesced events carry how many extractions they stand for
+                        enriched: Math.min(currentCounts.enriched + (statusData.result.count || 1), currentCounts.total)
                       }
                     } as EnrichmentCounts
                   };
@@ -384,7 +392,7 @@ function App() {
                       ...prev.enrichmentCounts,
                       [category]: {
                         ...currentCounts,
-                        total: Math.max(0, currentCounts.total - 1)
+                        total: Math.max(0, currentCounts.total - (statusData.result.count || 1))
                       }
                     } as EnrichmentCounts
                   };
@@ -448,7 +456,7 @@ function App() {
                     ...prev.docCounts,
                     [docType]: {
                       initial: prev.docCounts[docType].initial,
-                      kept: prev.docCounts[docType].kept + 1
+                      kept: prev.docCounts[docType].kept + (statusData.result.count || 1)
                     }
                   } as DocCounts
                 };
@@ -659,6 +667,7 @@ function App() {
 
       if (data.job_id) {
         console.log("Connecting WebSocket with job_id:", data.job_id);
+        lastEventIdRef.current = null;
         connectWebSocket(data.job_id);
       } else {
         throw new Error("No job ID received");